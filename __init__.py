@@ -10,14 +10,19 @@
 """
 
 
+from . import cache
 from . import path
+from . import pixel_format
 from . import opencv
 from . import yuv_reader
 from . import yuv_writer
+from . import y4m
 from . import yuv
 from . import os
 from . import image
 from . import ffmpeg
+from . import cube
+from . import tile
 from . import lut
 from . import filter
 from . import histogram
@@ -0,0 +1,105 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+@file        : cache.py
+@description : cache utils
+@version     : 1.0
+"""
+
+import threading
+from collections import OrderedDict
+
+class LruCache:
+    """LRU cache bounded by bytes rather than entry count
+
+    Args:
+        max_bytes (int): capacity in bytes, entries larger than it are not cached
+    """
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, key):
+        return key in self.entries
+
+    def get(self, key, default=None):
+        """get value of key and mark it as most recently used, default if not cached"""
+
+        with self.lock:
+            if key not in self.entries:
+                self.misses += 1
+                return default
+
+            self.hits += 1
+            self.entries.move_to_end(key)
+
+            return self.entries[key][0]
+
+    def put(self, key, value, nbytes=None):
+        """put value of key, evicting least recently used entries to fit
+
+        Args:
+            key : hashable key
+            value : value, e.g., np.array
+            nbytes (int, optional): size of value. Defaults to None, i.e., value.nbytes.
+        """
+
+        nbytes = value.nbytes if nbytes is None else nbytes
+
+        with self.lock:
+            if key in self.entries:
+                self.bytes -= self.entries.pop(key)[1]
+
+            if nbytes > self.max_bytes:
+                return
+
+            while self.bytes + nbytes > self.max_bytes:
+                _, (_, evicted_nbytes) = self.entries.popitem(last=False)
+                self.bytes -= evicted_nbytes
+                self.evictions += 1
+
+            self.entries[key] = (value, nbytes)
+            self.bytes += nbytes
+
+    def get_or_compute(self, key, compute):
+        """get value of key, or compute, cache and return it on miss"""
+
+        value = self.get(key, self)
+        if value is self:
+            value = compute()
+            self.put(key, value)
+
+        return value
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.bytes = 0
+
+    def get_stats(self):
+        """get statistics
+
+        Returns:
+            dict: hits, misses, evictions, entries, bytes and max_bytes
+        """
+
+        with self.lock:
+            return {
+                "hits"     : self.hits,
+                "misses"   : self.misses,
+                "evictions": self.evictions,
+                "entries"  : len(self.entries),
+                "bytes"    : self.bytes,
+                "max_bytes": self.max_bytes,
+            }
@@ -0,0 +1,249 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+@file        : cube.py
+@description : .cube (Adobe / Resolve) lut file utils
+@version     : 1.0
+"""
+
+import os
+import re
+import hashlib
+
+import numpy as np
+
+from . import cache
+
+CUBE_SUFFIX = ".cube"
+
+# first data line, i.e., first line starting with a number
+_DATA_PATTERN = re.compile(rb"^[ \t]*[-+.\d]", re.MULTILINE)
+
+_COMMENT_PATTERN = re.compile(rb"#[^\n]*")
+
+# process-wide cache of parsed cube files, see load_cube_file
+_CUBE_CACHE = cache.LruCache(256 << 20)
+
+def is_cube_file(filename):
+    """is_cube_file
+
+    Args:
+        filename (str): file name
+
+    Returns:
+        bool: True if file name ends with .cube
+    """
+    return filename.lower().endswith(CUBE_SUFFIX)
+
+def _parse_triple(values, line):
+    if len(values) != 3:
+        raise ValueError(f"Error: invalid cube line: {line[:64]}")
+
+    return np.array([float(value) for value in values], dtype=np.float32)
+
+def parse_cube(data):
+    """parse .cube file content
+
+    Data lines are parsed at once by np.fromstring, keywords are only expected before data lines.
+
+    Args:
+        data (bytes): file content
+
+    Returns:
+        dict: title (str), lut_1d (np.array of size * 3 or None),
+              lut_3d (np.array of size * size * size * 3 indexed by [b, g, r], or None),
+              domain_1d / domain_3d (np.array of 2 * 3, input [min, max] of each lut), all float32
+    """
+
+    match = _DATA_PATTERN.search(data)
+    header, body = (data, b"") if match is None else (data[:match.start()], data[match.start():])
+
+    cube = {"title": "", "lut_1d": None, "lut_3d": None}
+
+    size_1d = size_3d = 0
+    domain = None
+    domain_1d = domain_3d = None
+
+    for line in header.decode("utf-8", "replace").splitlines():
+        line = line.split("#", 1)[0].strip()
+        if not line:
+            continue
+
+        keyword, _, value = line.partition(" ")
+        keyword, value = keyword.upper(), value.strip()
+
+        if keyword == "TITLE":
+            cube["title"] = value.strip('"')
+        elif keyword == "LUT_1D_SIZE":
+            size_1d = int(value)
+        elif keyword == "LUT_3D_SIZE":
+            size_3d = int(value)
+        elif keyword in ("DOMAIN_MIN", "DOMAIN_MAX"):
+            domain = np.array([[0, 0, 0], [1, 1, 1]], dtype=np.float32) if domain is None else domain
+            domain[0 if keyword == "DOMAIN_MIN" else 1] = _parse_triple(value.split(), line)
+        elif keyword in ("LUT_1D_INPUT_RANGE", "LUT_3D_INPUT_RANGE"):
+            low, high = (float(v) for v in value.split())
+            input_range = np.array([[low] * 3, [high] * 3], dtype=np.float32)
+
+            if keyword == "LUT_1D_INPUT_RANGE":
+                domain_1d = input_range
+            else:
+                domain_3d = input_range
+
+    if not size_1d and not size_3d:
+        raise ValueError("Error: cube without LUT_1D_SIZE or LUT_3D_SIZE")
+
+    if b"#" in body:
+        body = _COMMENT_PATTERN.sub(b"", body)
+
+    values = np.fromstring(body.decode("ascii"), dtype=np.float32, sep=" ")
+
+    expected = 3 * (size_1d + size_3d ** 3)
+    if values.size != expected:
+        raise ValueError(f"Error: cube of {values.size} values, expect {expected}")
+
+    values = values.reshape(-1, 3)
+
+    default_domain = np.array([[0, 0, 0], [1, 1, 1]], dtype=np.float32)
+
+    # NOTE: 1d shaper comes first in resolve files of both luts
+    if size_1d:
+        cube["lut_1d"] = values[:size_1d]
+
+    if size_3d:
+        cube["lut_3d"] = values[size_1d:].reshape(size_3d, size_3d, size_3d, 3)
+
+    # DOMAIN_MIN/MAX of adobe applies to the only lut of file, input range of resolve to each lut
+    if domain_1d is None:
+        domain_1d = default_domain if domain is None else domain
+
+    if domain_3d is None:
+        domain_3d = default_domain if domain is None or size_1d else domain
+
+    cube["domain_1d"] = domain_1d
+    cube["domain_3d"] = domain_3d
+
+    return cube
+
+def format_cube(lut_3d=None, lut_1d=None, title=None, domain_min=(0.0, 0.0, 0.0), domain_max=(1.0, 1.0, 1.0)):
+    """format .cube file content of one lut
+
+    Args:
+        lut_3d (np.array, optional): float lattice of size * size * size * 3 indexed by [b, g, r]. Defaults to None.
+        lut_1d (np.array, optional): float table of size * 3. Defaults to None.
+        title (str, optional): title. Defaults to None.
+        domain_min (tuple, optional): input minimum of r, g, b. Defaults to (0.0, 0.0, 0.0).
+        domain_max (tuple, optional): input maximum of r, g, b. Defaults to (1.0, 1.0, 1.0).
+
+    Returns:
+        bytes: file content
+    """
+
+    if (lut_3d is None) == (lut_1d is None):
+        raise ValueError("Error: exactly one of lut_3d and lut_1d should be given")
+
+    lines = []
+
+    if title:
+        lines.append(f'TITLE "{title}"')
+
+    if lut_3d is not None:
+        table = np.asarray(lut_3d, dtype=np.float32)
+        size = table.shape[0]
+
+        if table.shape != (size, size, size, 3):
+            raise ValueError(f"Error: invalid 3d lut shape: {table.shape}")
+
+        lines.append(f"LUT_3D_SIZE {size}")
+    else:
+        table = np.asarray(lut_1d, dtype=np.float32)
+
+        if table.ndim != 2 or table.shape[1] != 3:
+            raise ValueError(f"Error: invalid 1d lut shape: {table.shape}")
+
+        lines.append(f"LUT_1D_SIZE {table.shape[0]}")
+
+    lines.append("DOMAIN_MIN {:g} {:g} {:g}".format(*domain_min))
+    lines.append("DOMAIN_MAX {:g} {:g} {:g}".format(*domain_max))
+
+    values = table.reshape(-1, 3)
+
+    # NOTE: one % formatting of all values, much faster than per line formatting
+    body = ("%.6f %.6f %.6f\n" * len(values)) % tuple(values.ravel().tolist())
+
+    return ("\n".join(lines) + "\n\n" + body).encode("ascii")
+
+def read_cube_file(filename):
+    """read and parse .cube file, see parse_cube"""
+
+    with open(filename, "rb") as file:
+        return parse_cube(file.read())
+
+def write_cube_file(filename, lut_3d=None, lut_1d=None, title=None, domain_min=(0.0, 0.0, 0.0), domain_max=(1.0, 1.0, 1.0)):
+    """write .cube file, see format_cube"""
+
+    data = format_cube(lut_3d, lut_1d, title, domain_min, domain_max)
+
+    with open(filename, "wb") as file:
+        file.write(data)
+
+def _get_cube_nbytes(cube):
+    return sum(value.nbytes for value in cube.values() if isinstance(value, np.ndarray))
+
+def load_cube_file(filename, use_cache=True, cache_key="stat"):
+    """load .cube file through the process-wide cache of parsed luts
+
+    Args:
+        filename (str): .cube file name
+        use_cache (bool, optional): look up and store parsed lut in cache. Defaults to True.
+        cache_key (str, optional): "stat" keys by (path, mtime, size) without reading file on hit,
+                                   "content" keys by sha1 of file content, e.g., for copies of a look
+                                   in different job folders. Defaults to "stat".
+
+    Returns:
+        dict: parsed lut, see parse_cube, arrays are read-only
+    """
+
+    if not use_cache:
+        return read_cube_file(filename)
+
+    data = None
+
+    if cache_key == "stat":
+        stat = os.stat(filename)
+        key = ("stat", os.path.realpath(filename), stat.st_mtime_ns, stat.st_size)
+    elif cache_key == "content":
+        with open(filename, "rb") as file:
+            data = file.read()
+        key = ("content", hashlib.sha1(data).hexdigest())
+    else:
+        raise ValueError(f"Error: unsupported cache key: {cache_key}")
+
+    cube = _CUBE_CACHE.get(key)
+
+    if cube is None:
+        cube = parse_cube(data) if data is not None else read_cube_file(filename)
+
+        for value in cube.values():
+            if isinstance(value, np.ndarray):
+                value.flags.writeable = False
+
+        _CUBE_CACHE.put(key, cube, _get_cube_nbytes(cube))
+
+    # NOTE: shallow copy, callers may modify dict but not cached arrays
+    return dict(cube)
+
+def get_cube_cache_stats():
+    """get statistics of cube cache, see cache.LruCache.get_stats"""
+
+    return _CUBE_CACHE.get_stats()
+
+def set_cube_cache_bytes(max_bytes):
+    """set capacity of cube cache, cached luts are dropped"""
+
+    global _CUBE_CACHE
+    _CUBE_CACHE = cache.LruCache(max_bytes)
+
+def clear_cube_cache():
+    _CUBE_CACHE.clear()
@@ -9,10 +9,199 @@
 @version     : 1.0
 """
 
+import functools
+import concurrent.futures
+import os
+
 import numpy as np
 import cv2
 
-def homomorphic_filter(src: np.ndarray, cutoff_freq: int=200, gamma_low: float=0.5, gamma_high: float=2.0, sharp_factor: float=0.1, use_yuv: bool=False) -> np.ndarray:
+from . import tile
+
+
+# pixels of each sub-stack of homomorphic_filter_batch
+_BATCH_PIXELS = 1 << 18
+
+# spatial blur taps costing as much as fft per log2(pixels), crossover is about 9 - 12 by __main__ benchmark
+_SPATIAL_TAPS_PER_FFT_LOG2 = 8.0
+
+
+@functools.lru_cache(maxsize=8)
+def get_homomorphic_kernel(rows: int, cols: int, cutoff_freq: float, gamma_low: float, gamma_high: float, sharp_factor: float) -> np.ndarray:
+    """get gaussian high emphasis transfer function of homomorphic filter, for rfft2 spectrum
+
+    The kernel is built in unshifted frequency order, so that it multiplies rfft2 spectrum directly
+    without fftshift / ifftshift.
+
+    Args:
+        rows (int): image rows
+        cols (int): image columns
+        cutoff_freq (float): cut-off frequency
+        gamma_low (float): gamma value of low frequency part
+        gamma_high (float): gamma value of high frequency part
+        sharp_factor (float): sharpening factor
+
+    Returns:
+        np.ndarray: read-only float32 kernel of size rows * (cols // 2 + 1)
+    """
+
+    # frequencies in cycles per image, i.e., the centered meshgrid of fftshift-ed spectrum
+    freq_rows = np.fft.fftfreq(rows, 1.0 / rows)
+    freq_cols = np.fft.rfftfreq(cols, 1.0 / cols)
+
+    distance_square = freq_rows[:, None] ** 2 + freq_cols[None, :] ** 2
+
+    kernel = (gamma_high - gamma_low) * (1 - np.exp(-sharp_factor * (distance_square / cutoff_freq ** 2))) + gamma_low
+    kernel = kernel.astype(np.float32)
+
+    kernel.flags.writeable = False
+
+    return kernel
+
+
+def get_homomorphic_gaussian_sigma(rows: int, cols: int, cutoff_freq: float, sharp_factor: float) -> tuple:
+    """get sigma of spatial gaussian equivalent to transfer function of get_homomorphic_kernel
+
+    Z(D) = gamma_high - (gamma_high - gamma_low) * exp(-sharp_factor * D^2 / cutoff_freq^2), D in cycles per image,
+    and gaussian of sigma (pixels) has transfer function exp(-2 * pi^2 * sigma^2 * (D / size)^2), so that
+    filtered log = gamma_high * log - (gamma_high - gamma_low) * blur(log), blurred with wrapped borders as fft.
+
+    Args:
+        rows (int): image rows
+        cols (int): image columns
+        cutoff_freq (float): cut-off frequency
+        sharp_factor (float): sharpening factor
+
+    Returns:
+        tuple: (sigma_y, sigma_x) in pixels
+    """
+
+    scale = np.sqrt(max(sharp_factor, 0.0) / 2.0) / (np.pi * cutoff_freq)
+
+    return rows * scale, cols * scale
+
+
+# taps of spatial gaussian are truncated below this ratio to the center tap
+_GAUSSIAN_TAP_TOLERANCE = 1e-5
+
+
+@functools.lru_cache(maxsize=16)
+def _get_gaussian_taps(size: int, cutoff_freq: float, sharp_factor: float) -> np.ndarray:
+    """1d taps of periodic gaussian, inverse dft of the transfer function along one axis of size,
+    exact for sub pixel sigma where sampled gaussian is not, truncated by _GAUSSIAN_TAP_TOLERANCE"""
+
+    freq = np.fft.fftfreq(size, 1.0 / size)
+    taps = np.fft.ifft(np.exp(-sharp_factor * freq ** 2 / cutoff_freq ** 2)).real
+
+    # NOTE: taps are symmetric, radius of the last significant tap of the first half
+    significant = np.nonzero(np.abs(taps[:(size + 1) // 2]) > _GAUSSIAN_TAP_TOLERANCE * abs(taps[0]))[0]
+    radius = min(int(significant[-1]), (size - 1) // 2)
+
+    taps = np.concatenate((taps[size - radius:], taps[:radius + 1])).astype(np.float32)
+    taps.flags.writeable = False
+
+    return taps
+
+
+def _estimate_spatial_cost(rows: int, cols: int, cutoff_freq: float, sharp_factor: float) -> float:
+    """estimate of spatial / fft time ratio, see __main__ benchmark for the constant"""
+
+    taps = len(_get_gaussian_taps(rows, cutoff_freq, sharp_factor)) + len(_get_gaussian_taps(cols, cutoff_freq, sharp_factor))
+
+    return taps / (_SPATIAL_TAPS_PER_FFT_LOG2 * np.log2(rows * cols))
+
+
+def _filter_log_fft(log_gray: np.ndarray, cutoff_freq: float, gamma_low: float, gamma_high: float, sharp_factor: float) -> np.ndarray:
+    rows, cols = log_gray.shape[-2:]
+
+    kernel = get_homomorphic_kernel(rows, cols, cutoff_freq, gamma_low, gamma_high, sharp_factor)
+
+    spectrum = np.fft.rfft2(log_gray)
+    spectrum *= kernel
+
+    return np.fft.irfft2(spectrum, s=(rows, cols))
+
+
+def _filter_log_spatial(log_gray: np.ndarray, cutoff_freq: float, gamma_low: float, gamma_high: float, sharp_factor: float) -> np.ndarray:
+    rows, cols = log_gray.shape[-2:]
+
+    taps_y = _get_gaussian_taps(rows, cutoff_freq, sharp_factor)
+    taps_x = _get_gaussian_taps(cols, cutoff_freq, sharp_factor)
+
+    radius_y, radius_x = len(taps_y) // 2, len(taps_x) // 2
+
+    dst = np.empty_like(log_gray)
+
+    for index in np.ndindex(log_gray.shape[:-2]):
+        frame = log_gray[index]
+
+        # NOTE: wrapped borders, periodic as fft
+        padded = cv2.copyMakeBorder(frame, radius_y, radius_y, radius_x, radius_x, cv2.BORDER_WRAP)
+        blurred = cv2.sepFilter2D(padded, -1, taps_x, taps_y)[radius_y: radius_y + rows, radius_x: radius_x + cols]
+
+        np.multiply(frame, np.float32(gamma_high), out=dst[index])
+        dst[index] -= np.float32(gamma_high - gamma_low) * blurred
+
+    return dst
+
+
+def _homomorphic_filter_gray(gray: np.ndarray, cutoff_freq: float, gamma_low: float, gamma_high: float, sharp_factor: float,
+                             method: str="fft") -> np.ndarray:
+    """homomorphic filter of gray image, or stack of gray images along leading axes, in float32,
+    each stretched to the dynamic range of its own gray"""
+
+    rows, cols = gray.shape[-2:]
+
+    if method == "auto":
+        method = "spatial" if _estimate_spatial_cost(rows, cols, cutoff_freq, sharp_factor) < 1.0 else "fft"
+
+    if method not in ("fft", "spatial"):
+        raise ValueError(f"Error: unsupported method: {method}")
+
+    log_gray = np.log1p(gray.astype(np.float32))
+
+    if method == "fft":
+        dst_gray = _filter_log_fft(log_gray, cutoff_freq, gamma_low, gamma_high, sharp_factor)
+    else:
+        dst_gray = _filter_log_spatial(log_gray, cutoff_freq, gamma_low, gamma_high, sharp_factor)
+
+    _exp_log_gray(dst_gray)
+
+    axes = (-2, -1)
+
+    return _stretch_gray(dst_gray, gray.min(axis=axes, keepdims=True), gray.max(axis=axes, keepdims=True),
+                         dst_gray.min(axis=axes, keepdims=True), dst_gray.max(axis=axes, keepdims=True))
+
+
+def _exp_log_gray(dst_gray: np.ndarray) -> np.ndarray:
+    """back from filtered log image in place, |exp(x) - 1|"""
+
+    np.exp(dst_gray, out=dst_gray)
+    dst_gray -= 1
+    np.abs(dst_gray, out=dst_gray)
+
+    return dst_gray
+
+
+def _stretch_gray(dst_gray: np.ndarray, gray_min, gray_max, dmin, dmax) -> np.ndarray:
+    """stretch filtered gray in place to the same dynamic range as original, by min / max of original gray
+    and of filtered gray, returns uint8"""
+
+    drange = dmax - dmin
+    dst_gray_max = np.minimum(255, np.maximum(dmax, gray_max))
+    dst_gray_min = np.minimum(dmin, gray_min)
+
+    scale = np.divide(dst_gray_max - dst_gray_min, drange, out=np.zeros_like(drange), where=drange > 0)
+
+    dst_gray -= dmin
+    dst_gray *= scale
+    dst_gray += dst_gray_min
+
+    return np.clip(dst_gray, 0, 255).astype(np.uint8)
+
+
+def homomorphic_filter(src: np.ndarray, cutoff_freq: int=200, gamma_low: float=0.5, gamma_high: float=2.0, sharp_factor: float=0.1, use_yuv: bool=False,
+                       method: str="auto") -> np.ndarray:
     """apply Histogram Equalization to image
     
     homomorphic_filter(src[, cutoff_freq, gamma_low, gamma_high, sharp_factor, use_yuv])
@@ -24,59 +213,279 @@ def homomorphic_filter(src: np.ndarray, cutoff_freq: int=200, gamma_low: float=0
         gamma_high (float): gamma value of high frequency part, used to enhance or attenuate the high frequency part
         sharp_factor (float): sharpening factor, controlling the enhancement degree of the high frequency part
         use_yuv (bool): use yuv or use hsv when input BGR image, default to use hsv
+        method (str): "fft", "spatial" (separable gaussian blur of log image, see get_homomorphic_gaussian_sigma),
+                      or "auto" to choose the cheaper one by image size and cutoff, default to use auto
 
     Returns:
         np.ndarray: result BGR image or gray image with Histogram Equalization
+
+    Note: transfer function is cached per size and parameters, see get_homomorphic_kernel,
+          filtered by float32 rfft2 / irfft2 or equivalent spatial blur, which differ by at most 1 LSB
     """
-    gray = src.copy()
-
-    if len(src.shape) > 2:
-        if use_yuv:
-            yuv = cv2.cvtColor(src, cv2.COLOR_BGR2YCrCb)
-            gray, u, v = cv2.split(yuv)
-        else:
-            hsv = cv2.cvtColor(src, cv2.COLOR_BGR2HSV)
-            h, s, gray = cv2.split(hsv)
-
-    gray = np.float64(gray)
-    log_gray = np.log(gray + 1)
-    rows, cols = gray.shape
-
-    # fft
-    gray_fft = np.fft.fft2(log_gray)
-    gray_fftshift = np.fft.fftshift(gray_fft)
-
-    result_fftshift = np.zeros_like(gray_fftshift)
-    M, N = np.meshgrid(np.arange(-cols // 2, cols // 2), np.arange(-rows//2, rows//2))
-
-    # filter
-    D = np.sqrt(M ** 2 + N ** 2)
-    Z = (gamma_high - gamma_low) * (1 - np.exp(-sharp_factor * (D ** 2 / cutoff_freq ** 2))) + gamma_low
-    result_fftshift = Z * gray_fftshift
-
-    # inverse fft
-    result_ifftshift = np.fft.ifftshift(result_fftshift)
-    result_ifft = np.fft.ifft2(result_ifftshift)
-
-    dst_gray = np.abs(np.exp(result_ifft) -1)
-    dmax, dmin = np.max(dst_gray), np.min(dst_gray)
-    drange = dmax - dmin
-    dst_gray_max = min(255, max(dmax, np.max(gray)))
-    dst_gray_min = min(dmin, np.min(gray))
+    gray, planes = _split_gray(src, use_yuv)
+
+    dst = _homomorphic_filter_gray(gray, cutoff_freq, gamma_low, gamma_high, sharp_factor, method)
+
+    return _merge_gray(dst, planes, use_yuv)
+
+
+def _split_gray(src: np.ndarray, use_yuv: bool):
+    """split gray image, or Y of YCrCb / V of HSV of BGR image, returns (gray, other planes or None)"""
+
+    if len(src.shape) <= 2:
+        return src, None
+
+    if use_yuv:
+        y, u, v = cv2.split(cv2.cvtColor(src, cv2.COLOR_BGR2YCrCb))
+        return y, (u, v)
+
+    h, s, v = cv2.split(cv2.cvtColor(src, cv2.COLOR_BGR2HSV))
+    return v, (h, s)
+
+
+def _merge_gray(dst: np.ndarray, planes, use_yuv: bool) -> np.ndarray:
+    """merge filtered gray back with planes of _split_gray"""
+
+    if planes is None:
+        return dst
+
+    if use_yuv:
+        return cv2.cvtColor(cv2.merge([dst, *planes]), cv2.COLOR_YCrCb2BGR)
+
+    return cv2.cvtColor(cv2.merge([*planes, dst]), cv2.COLOR_HSV2BGR)
+
+
+def homomorphic_filter_batch(frames: np.ndarray, cutoff_freq: int=200, gamma_low: float=0.5, gamma_high: float=2.0, sharp_factor: float=0.1,
+                             use_yuv: bool=False, workers: int=None, out: np.ndarray=None, method: str="auto") -> np.ndarray:
+    """apply homomorphic filter to a stack of frames, see homomorphic_filter
+
+    The whole stack shares one cached transfer function and is transformed by vectorized rfft2 / irfft2
+    along the leading axis, in sub-stacks of about _BATCH_PIXELS pixels processed by a thread pool,
+    as numpy fft releases the GIL.
+    Each frame is stretched to its own dynamic range, the same as homomorphic_filter.
+
+    Args:
+        frames (np.ndarray): uint8 stack of gray frames (N, H, W), or BGR frames (N, H, W, 3)
+        cutoff_freq (int): cut-off frequency
+        gamma_low (float): gamma value of low frequency part
+        gamma_high (float): gamma value of high frequency part
+        sharp_factor (float): sharpening factor
+        use_yuv (bool): use yuv or use hsv for BGR frames, default to use hsv
+        workers (int, optional): threads, None for cpu count. Defaults to None.
+        out (np.ndarray, optional): uint8 output buffer of same shape, may be frames itself. Defaults to None.
+        method (str, optional): "fft", "spatial" or "auto", see homomorphic_filter. Defaults to "auto".
+
+    Returns:
+        np.ndarray: filtered stack, the same object as out if given
+    """
+
+    if frames.ndim not in (3, 4) or (frames.ndim == 4 and frames.shape[3] != 3):
+        raise ValueError(f"Error: frames should be of size N * H * W or N * H * W * 3: {frames.shape}")
+
+    if out is None:
+        out = np.empty(frames.shape, dtype=np.uint8)
+    elif out.shape != frames.shape or out.dtype != np.uint8:
+        raise ValueError(f"Error: out should be uint8 of shape {frames.shape}")
+
+    # frames of each vectorized fft, bounded by pixels to keep intermediates cache friendly
+    chunk_frames = max(1, _BATCH_PIXELS // (frames.shape[1] * frames.shape[2]))
+    starts = range(0, len(frames), chunk_frames)
+
+    workers = os.cpu_count() if workers is None else workers
+
+    def process(start):
+        stop = min(start + chunk_frames, len(frames))
+
+        if frames.ndim == 3:
+            out[start:stop] = _homomorphic_filter_gray(frames[start:stop], cutoff_freq, gamma_low, gamma_high, sharp_factor, method)
+            return
+
+        splits = [_split_gray(frame, use_yuv) for frame in frames[start:stop]]
+
+        grays = np.stack([gray for gray, _ in splits])
+        dsts = _homomorphic_filter_gray(grays, cutoff_freq, gamma_low, gamma_high, sharp_factor, method)
+
+        for i, (dst, (_, planes)) in enumerate(zip(dsts, splits)):
+            out[start + i] = _merge_gray(dst, planes, use_yuv)
+
+    if workers <= 1 or len(starts) <= 1:
+        for start in starts:
+            process(start)
+    else:
+        with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+            list(executor.map(process, starts))
+
+    return out
+
+
+def homomorphic_filter_yuv_reader(reader, cutoff_freq: int=200, gamma_low: float=0.5, gamma_high: float=2.0, sharp_factor: float=0.1,
+                                  batch_size: int=8, workers: int=None, start: int=0, stop: int=None, method: str="auto"):
+    """stream homomorphic filtered frames of yuv reader, only Y plane is filtered, chroma planes are kept
+
+    for idx, frame in filter.homomorphic_filter_yuv_reader(reader):
+        writer.write_frame(frame)
+
+    Args:
+        reader (yuv_reader.YuvReader): reader of 8 bit pixel format
+        cutoff_freq (int): cut-off frequency
+        gamma_low (float): gamma value of low frequency part
+        gamma_high (float): gamma value of high frequency part
+        sharp_factor (float): sharpening factor
+        batch_size (int, optional): frames filtered by each homomorphic_filter_batch. Defaults to 8.
+        workers (int, optional): threads of homomorphic_filter_batch, None for cpu count. Defaults to None.
+        start (int, optional): first frame index. Defaults to 0.
+        stop (int, optional): end frame index (exclusive). Defaults to None, i.e., frame num.
+        method (str, optional): "fft", "spatial" or "auto", see homomorphic_filter. Defaults to "auto".
+
+    Yields:
+        tuple: (idx, frame), frame of reader pixel format, valid until the next batch is filtered
+    """
+
+    pix_fmt = reader.get_pixel_format()
+
+    if pix_fmt.dtype != np.uint8:
+        raise ValueError(f"Error: only 8 bit pixel format is supported: {pix_fmt.name}")
+
+    width, height = reader.get_width(), reader.get_height()
+
+    frames = np.empty((batch_size,) + pix_fmt.get_frame_shape(width, height), dtype=np.uint8)
+    y_planes = [pix_fmt.get_planes(frame, width, height)["y"] for frame in frames]
+
+    grays = np.empty((batch_size, height, width), dtype=np.uint8)
+
+    def filter_batch(count):
+        homomorphic_filter_batch(grays[:count], cutoff_freq, gamma_low, gamma_high, sharp_factor,
+                                 workers=workers, out=grays[:count], method=method)
+
+        for i in range(count):
+            y_planes[i][...] = grays[i]
+
+    indices = []
+    for idx, frame in reader.iter_frames(start, stop):
+        i = len(indices)
+
+        frames[i] = frame
+        grays[i] = y_planes[i]
+        indices.append(idx)
+
+        if len(indices) == batch_size:
+            filter_batch(batch_size)
+            yield from zip(indices, frames)
+            indices = []
+
+    if indices:
+        filter_batch(len(indices))
+        yield from zip(indices, frames[:len(indices)])
+
+
+def homomorphic_filter_tiled(src: np.ndarray, cutoff_freq: int=200, gamma_low: float=0.5, gamma_high: float=2.0, sharp_factor: float=0.1,
+                             use_yuv: bool=False, out: np.ndarray=None, memory_budget: int=tile.DEFAULT_MEMORY_BUDGET) -> np.ndarray:
+    """apply homomorphic filter to a large image by full width row bands, see homomorphic_filter
+
+    Only log --> filter --> exp is banded: each band is read with a halo of the gaussian radius, wrapped around
+    the image as fft, and blurred by the spatial method, so that filtered bands are exact. The first pass
+    takes global min / max of filtered and original gray, the second pass filters again and applies one
+    global stretch, so that the result equals homomorphic_filter(method="spatial") without holding the image,
+    and differs from the fft method by at most 1 LSB of gray.
+
+    Args:
+        src (np.ndarray): origin BGR image or gray image, e.g., np.memmap
+        cutoff_freq (int): cut-off frequency
+        gamma_low (float): gamma value of low frequency part
+        gamma_high (float): gamma value of high frequency part
+        sharp_factor (float): sharpening factor
+        use_yuv (bool): use yuv or use hsv when input BGR image, default to use hsv
+        out (np.ndarray, optional): uint8 output of same shape, e.g., np.memmap. Defaults to None.
+        memory_budget (int, optional): bytes of each band with halo. Defaults to tile.DEFAULT_MEMORY_BUDGET.
+
+    Returns:
+        np.ndarray: result BGR image or gray image, the same object as out if given
+
+    Note: cost grows with gaussian radius, i.e., size / cutoff_freq, as the spatial method
+    """
+    rows, cols = src.shape[:2]
+
+    if out is None:
+        out = np.empty(src.shape, dtype=np.uint8)
+    elif out.shape != src.shape or out.dtype != np.uint8:
+        raise ValueError(f"Error: out should be uint8 of shape {src.shape}")
+
+    taps_y = _get_gaussian_taps(rows, cutoff_freq, sharp_factor)
+    taps_x = _get_gaussian_taps(cols, cutoff_freq, sharp_factor)
+
+    radius_y, radius_x = len(taps_y) // 2, len(taps_x) // 2
+
+    # NOTE: src and planes of halo rows, log, padded log, blur and filtered float32 per pixel
+    band_rows = tile.get_band_rows(src.shape, memory_budget, 16 + 4 * (src.shape[2] if src.ndim > 2 else 1),
+                                   radius_y, radius_x)
+
+    col_index = np.arange(-radius_x, cols + radius_x) % cols
+
+    def filter_band(start, stop):
+        """filtered gray of rows [start, stop), and gray, planes of the same rows"""
+
+        # NOTE: wrapped halo rows and columns, periodic as fft
+        halo_src = np.ascontiguousarray(src[np.arange(start - radius_y, stop + radius_y) % rows])
+        gray, planes = _split_gray(halo_src, use_yuv)
+
+        log_gray = np.log1p(gray.astype(np.float32))
+
+        padded = np.ascontiguousarray(log_gray[:, col_index])
+        blurred = cv2.sepFilter2D(padded, -1, taps_x, taps_y)[radius_y: radius_y + stop - start, radius_x: radius_x + cols]
+
+        dst_gray = log_gray[radius_y: radius_y + stop - start] * np.float32(gamma_high)
+        dst_gray -= np.float32(gamma_high - gamma_low) * blurred
+
+        center = slice(radius_y, radius_y + stop - start)
+        planes = None if planes is None else tuple(np.ascontiguousarray(plane[center]) for plane in planes)
+
+        return _exp_log_gray(dst_gray), gray[center], planes
+
+    bands = [(start, min(start + band_rows, rows)) for start in range(0, rows, band_rows)]
+
+    # first pass, global min / max of original and filtered gray
+    gray_min, gray_max = np.float32(255), np.float32(0)
+    dmin, dmax = np.float32(np.inf), np.float32(-np.inf)
+
+    for start, stop in bands:
+        dst_gray, gray, _ = filter_band(start, stop)
+
+        gray_min, gray_max = min(gray_min, np.float32(gray.min())), max(gray_max, np.float32(gray.max()))
+        dmin, dmax = min(dmin, dst_gray.min()), max(dmax, dst_gray.max())
+
+    # second pass, one global stretch
+    for start, stop in bands:
+        dst_gray, _, planes = filter_band(start, stop)
+
+        out[start: stop] = _merge_gray(_stretch_gray(dst_gray, gray_min, gray_max, dmin, dmax), planes, use_yuv)
+
+    return out
+
+if __name__ == '__main__':
+
+    import time
+
+    # benchmark of spatial method and crossover against fft, run by: python -m orion.filter
+    # accuracy is asserted by tests/test_filter.py
+    def measure(function, repeat=3):
+        elapsed = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            result = function()
+            elapsed.append(time.perf_counter() - start)
+        return min(elapsed), result
+
+    random_state = np.random.RandomState(0)
 
-    # stretch to the same dynamic range as original
-    for i in range(rows):
-        for j in range(cols):
-            dst_gray[i, j] = (dst_gray_max - dst_gray_min) * (dst_gray[i, j] - dmin) / drange + dst_gray_min
+    for rows, cols in ((480, 640), (1080, 1920), (2160, 3840)):
+        gray = cv2.GaussianBlur(random_state.randint(0, 256, (rows, cols)).astype(np.uint8), (5, 5), 2)
 
-    dst = np.uint8(np.clip(dst_gray, 0, 255))
+        for cutoff_freq in (200, 50, 20, 10, 5):
+            fft_time, fft_result = measure(lambda: _homomorphic_filter_gray(gray, cutoff_freq, 0.5, 2.0, 0.1, "fft"))
+            spatial_time, spatial_result = measure(lambda: _homomorphic_filter_gray(gray, cutoff_freq, 0.5, 2.0, 0.1, "spatial"))
 
-    if len(src.shape) > 2:
-        if use_yuv:
-            yuv = cv2.merge([dst, u, v])
-            dst = cv2.cvtColor(yuv, cv2.COLOR_YCrCb2BGR)
-        else:
-            hsv = cv2.merge([h, s, dst])
-            dst = cv2.cvtColor(hsv, cv2.COLOR_HSV2BGR)
+            diff = np.abs(fft_result.astype(np.int32) - spatial_result)
+            auto = "spatial" if _estimate_spatial_cost(rows, cols, cutoff_freq, 0.1) < 1.0 else "fft"
 
-    return dst
\ No newline at end of file
+            print(f"{cols}x{rows} cutoff {cutoff_freq}: fft {fft_time * 1000:.1f} ms, spatial {spatial_time * 1000:.1f} ms, "
+                  f"auto {auto}, max diff {diff.max()}, mean diff {diff.mean():.5f}")
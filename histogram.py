@@ -12,6 +12,8 @@
 import numpy as np
 import cv2
 
+from . import tile
+
 
 def he(src: np.ndarray, use_yuv: bool=True) -> np.ndarray:
     """apply Histogram Equalization to image
@@ -77,15 +79,147 @@ def clahe(src: np.ndarray, limit: float=0.8, grid: tuple=(33, 33), use_yuv: bool
 
     if len(src.shape) > 2:
         if use_yuv:
-            yuv = cv2.merge([gray, u, v])
+            yuv = cv2.merge([dst, u, v])
             dst = cv2.cvtColor(yuv, cv2.COLOR_YCrCb2BGR)
         else:
-            hsv = cv2.merge([h, s, gray])
+            hsv = cv2.merge([h, s, dst])
             dst = cv2.cvtColor(hsv, cv2.COLOR_HSV2BGR)
 
     return dst
 
 
+def _split_gray(src: np.ndarray, use_yuv: bool) -> tuple:
+    """split gray image, or Y of YCrCb / V of HSV of BGR image, returns (gray, other planes or None), as he"""
+    if len(src.shape) <= 2:
+        return src, None
+
+    if use_yuv:
+        gray, u, v = cv2.split(cv2.cvtColor(src, cv2.COLOR_BGR2YCrCb))
+        return gray, (u, v)
+
+    h, s, gray = cv2.split(cv2.cvtColor(src, cv2.COLOR_BGR2HSV))
+    return gray, (h, s)
+
+
+def _merge_gray(dst: np.ndarray, planes: tuple, use_yuv: bool) -> np.ndarray:
+    """merge equalized gray back with planes of _split_gray, as he"""
+    if planes is None:
+        return dst
+
+    if use_yuv:
+        return cv2.cvtColor(cv2.merge([dst, *planes]), cv2.COLOR_YCrCb2BGR)
+
+    return cv2.cvtColor(cv2.merge([*planes, dst]), cv2.COLOR_HSV2BGR)
+
+
+def get_equalize_lut(hist: np.ndarray) -> np.ndarray:
+    """get lookup table of Histogram Equalization from histogram, the same as cv2.equalizeHist
+
+    Args:
+        hist (np.ndarray): int64 histogram of 256 bins
+
+    Returns:
+        np.ndarray: uint8 lookup table of 256 entries
+    """
+    hist = np.asarray(hist, dtype=np.int64)
+
+    first = int(np.argmax(hist > 0))
+    total = int(hist.sum())
+
+    # NOTE: single gray level, cv2 fills image with the level
+    if hist[first] == total:
+        return np.full(256, first, dtype=np.uint8)
+
+    # NOTE: float32 arithmetic and round half to even of cv2, for bit exact output
+    scale = np.float32(255) / np.float32(total - hist[first])
+
+    cumsum = np.cumsum(hist) - hist[first]
+
+    lut = np.zeros(256, dtype=np.uint8)
+    lut[first:] = np.clip(np.rint(cumsum[first:].astype(np.float32) * scale), 0, 255)
+
+    return lut
+
+
+def he_tiled(src: np.ndarray, use_yuv: bool=True, out: np.ndarray=None,
+             memory_budget: int=tile.DEFAULT_MEMORY_BUDGET) -> np.ndarray:
+    """apply Histogram Equalization to a large image by full width row bands, see he
+
+    he_tiled(src[, use_yuv, out, memory_budget]) -> dst
+
+    The first pass accumulates the global histogram band by band, the second pass equalizes each band
+    by the lookup table of the global histogram, so that the result equals he without holding the image.
+
+    Args:
+        src (np.ndarray): origin BGR image or gray image, e.g., np.memmap
+        use_yuv (bool): use yuv or use hsv when input BGR image, default to use yuv
+        out (np.ndarray): uint8 output of same shape, e.g., np.memmap, default to allocate
+        memory_budget (int): bytes of each band
+
+    Returns:
+        np.ndarray: result BGR image or gray image with Histogram Equalization, the same object as out if given
+    """
+    rows = src.shape[0]
+
+    if out is None:
+        out = np.empty(src.shape, dtype=np.uint8)
+    elif out.shape != src.shape or out.dtype != np.uint8:
+        raise ValueError(f"Error: out should be uint8 of shape {src.shape}")
+
+    band_rows = tile.get_band_rows(src.shape, memory_budget, bytes_per_pixel=16)
+    bands = [(start, min(start + band_rows, rows)) for start in range(0, rows, band_rows)]
+
+    hist = np.zeros(256, dtype=np.int64)
+
+    for start, stop in bands:
+        gray, _ = _split_gray(np.ascontiguousarray(src[start: stop]), use_yuv)
+
+        # NOTE: exact int64 counts, float32 of cv2.calcHist is not for more than 2^24 pixels
+        hist += np.bincount(gray.ravel(), minlength=256)
+
+    lut = get_equalize_lut(hist)
+
+    for start, stop in bands:
+        gray, planes = _split_gray(np.ascontiguousarray(src[start: stop]), use_yuv)
+
+        out[start: stop] = _merge_gray(cv2.LUT(gray, lut), planes, use_yuv)
+
+    return out
+
+
+def clahe_tiled(src: np.ndarray, limit: float=0.8, grid: tuple=(33, 33), use_yuv: bool=True, out: np.ndarray=None,
+                overlap: int=64, memory_budget: int=tile.DEFAULT_MEMORY_BUDGET, workers: int=None) -> np.ndarray:
+    """apply Contrast Limited Adaptive Histogram Equalization to a large image by overlapping tiles,
+    see clahe and tile.process_tiles
+
+    clahe_tiled(src[, limit, grid, use_yuv, out, overlap, memory_budget, workers]) -> dst
+
+    Args:
+        src (np.ndarray): origin BGR image or gray image, e.g., np.memmap
+        limit (float): contrast limiting threshold
+        grid (tuple): grid size of the whole image, tiles keep its cell size
+        use_yuv (bool): use yuv or use hsv when input BGR image, default to use yuv
+        out (np.ndarray): uint8 output of same shape, e.g., np.memmap, default to allocate
+        overlap (int): overlap of neighboring tiles
+        memory_budget (int): bytes of tiled processing
+        workers (int): threads, None for cpu count
+
+    Returns:
+        np.ndarray: result BGR image or gray image with histogram equalization
+    """
+    rows, cols = src.shape[:2]
+
+    def process(src_tile):
+        # NOTE: grid of (cols, rows) as cv2, scaled so that cells of tiles are of the same size as the image's
+        tile_rows, tile_cols = src_tile.shape[:2]
+        tile_grid = (max(1, round(grid[0] * tile_cols / cols)), max(1, round(grid[1] * tile_rows / rows)))
+
+        return clahe(src_tile, limit, tile_grid, use_yuv)
+
+    return tile.process_tiles(src, process, out, overlap=overlap, memory_budget=memory_budget, workers=workers,
+                              working_bytes_per_pixel=16)
+
+
 def calculate_mean_and_variance(src: np.ndarray) -> tuple:
     """Calculate Mean and Variance of gray image.
 
@@ -9,10 +9,208 @@
 @version     : 1.0
 """
 
+import os
+import time
+import hashlib
+import tempfile
+import concurrent.futures
+
+import cv2
+
 from PIL import Image, ImageFilter
 
 import numpy as np
 
+from . import cube
+from . import path
+from . import yuv
+from . import yuv_reader
+from . import yuv_writer
+
+def convert_tile_image_to_lattice(lut_array, size, tiles_per_row=None):
+    """convert tile lut image to lattice
+
+    Tile image has size / tiles_per_row rows of tiles_per_row tiles, each tile is a size * size
+    (g, r) slice of b, i.e., pixel (cy, cx) = (size * (b // tiles_per_row) + g, size * (b % tiles_per_row) + r).
+    e.g., 512x512 lut is 8x8 tiles of 64, 1024x32 lut is 32 tiles of 32 in one row.
+
+    Args:
+        lut_array (np.array): rgb tile image of size (size * size / tiles_per_row) * (size * tiles_per_row) * 3
+        size (int): lattice size
+        tiles_per_row (int, optional): tiles per row. Defaults to None, i.e., sqrt(size) if square else size.
+
+    Returns:
+        np.array: lattice of size * size * size * 3, indexed by [b, g, r]
+    """
+
+    tiles_per_row = _get_tiles_per_row(size, tiles_per_row)
+    tile_rows = size // tiles_per_row
+
+    if lut_array.shape[:2] != (tile_rows * size, tiles_per_row * size):
+        raise ValueError(f"Error: lut image size not equal {tiles_per_row * size}x{tile_rows * size}: {lut_array.shape[1::-1]}")
+
+    lattice = lut_array.reshape(tile_rows, size, tiles_per_row, size, -1).transpose(0, 2, 1, 3, 4)
+
+    return lattice.reshape(size, size, size, -1)
+
+
+def convert_lattice_to_tile_image(lattice, tiles_per_row=None):
+    """convert lattice to tile lut image, inverse of convert_tile_image_to_lattice
+
+    Args:
+        lattice (np.array): lattice of size * size * size * 3, indexed by [b, g, r]
+        tiles_per_row (int, optional): tiles per row. Defaults to None, i.e., sqrt(size) if square else size.
+
+    Returns:
+        np.array: rgb tile image
+    """
+
+    size = lattice.shape[0]
+
+    tiles_per_row = _get_tiles_per_row(size, tiles_per_row)
+    tile_rows = size // tiles_per_row
+
+    tile_array = lattice.reshape(tile_rows, tiles_per_row, size, size, -1).transpose(0, 2, 1, 3, 4)
+
+    return np.ascontiguousarray(tile_array.reshape(tile_rows * size, tiles_per_row * size, -1))
+
+
+def convert_hald_image_to_lattice(hald_array):
+    """convert hald image to lattice
+
+    HALD image of level L has size L^3 * L^3, lattice size L^2, pixels in raster order are lattice points
+    with r changing fastest.
+
+    Args:
+        hald_array (np.array): rgb hald image
+
+    Returns:
+        np.array: lattice of size * size * size * 3, indexed by [b, g, r]
+    """
+
+    level = int(round(hald_array.shape[0] ** (1.0 / 3)))
+
+    if hald_array.shape[:2] != (level ** 3, level ** 3):
+        raise ValueError(f"Error: invalid hald image size: {hald_array.shape[1::-1]}")
+
+    size = level * level
+
+    return hald_array.reshape(size, size, size, -1)
+
+
+def convert_lattice_to_hald_image(lattice):
+    """convert lattice to hald image, inverse of convert_hald_image_to_lattice
+
+    Args:
+        lattice (np.array): lattice of size * size * size * 3, indexed by [b, g, r], size should be square
+
+    Returns:
+        np.array: rgb hald image
+    """
+
+    size = lattice.shape[0]
+    level = int(round(size ** 0.5))
+
+    if level * level != size:
+        raise ValueError(f"Error: lattice size is not square: {size}")
+
+    return np.ascontiguousarray(lattice).reshape(level ** 3, level ** 3, -1)
+
+
+def _fill_identity_lattice(values):
+    size = len(values)
+
+    lattice = np.empty((size, size, size, 3), dtype=np.uint8)
+    lattice[..., 0] = values[None, None, :]
+    lattice[..., 1] = values[None, :, None]
+    lattice[..., 2] = values[:, None, None]
+
+    return lattice
+
+
+def generate_identity_lattice(size=64):
+    """generate identity lattice, value of index i is round(i * 255 / (size - 1)), i.e., spanning 0 .. 255
+
+    Args:
+        size (int, optional): lattice size, at least 2. Defaults to 64.
+
+    Returns:
+        np.array: uint8 lattice of size * size * size * 3, indexed by [b, g, r]
+    """
+
+    if size < 2:
+        raise ValueError(f"Error: lattice size should be at least 2: {size}")
+
+    return _fill_identity_lattice(np.rint(np.arange(size) * 255.0 / (size - 1)).astype(np.uint8))
+
+
+def _generate_legacy_identity_lattice(size=64):
+    """identity lattice of legacy 512x512 / hald8 images, value of index i is i * (256 // size), i.e., 0, 4, ..., 252"""
+
+    return _fill_identity_lattice((np.arange(size) * (256 // size)).astype(np.uint8))
+
+
+def convert_lattice_to_pillow_3d_lut_filter(lattice):
+    """convert uint8 lattice to pillow 3d lut filter
+
+    Args:
+        lattice (np.array): uint8 lattice of size * size * size * 3, indexed by [b, g, r]
+
+    Returns:
+        ImageFilter.Color3DLUT: 3d cube lut filter of pillow
+    """
+
+    size = lattice.shape[0]
+
+    table = lattice.reshape(-1, 3).astype(np.float32) / 255.0
+
+    return ImageFilter.Color3DLUT((size, size, size), table, target_mode=None, _copy_table=False)
+
+
+def load_lut_image(lut_image_file, size=64, layout="tile", tiles_per_row=None):
+    """load lut image to lattice
+
+    Args:
+        lut_image_file (str): lut image file
+        size (int, optional): lattice size, not used by hald. Defaults to 64.
+        layout (str, optional): "tile" or "hald". Defaults to "tile".
+        tiles_per_row (int, optional): tiles per row of tile layout. Defaults to None.
+
+    Returns:
+        np.array: uint8 lattice of size * size * size * 3, indexed by [b, g, r]
+    """
+
+    lut_array = np.asarray(Image.open(lut_image_file).convert('RGB'))
+
+    if layout == "hald":
+        return convert_hald_image_to_lattice(lut_array)
+
+    if layout == "tile":
+        return convert_tile_image_to_lattice(lut_array, size, tiles_per_row)
+
+    raise ValueError(f"Error: unsupported lut layout: {layout}")
+
+
+def _get_tiles_per_row(size, tiles_per_row):
+    if tiles_per_row is None:
+        root = int(round(size ** 0.5))
+        tiles_per_row = root if root * root == size else size
+
+    if size % tiles_per_row:
+        raise ValueError(f"Error: lattice size {size} not divisible by tiles per row {tiles_per_row}")
+
+    return tiles_per_row
+
+
+def _save_image(array, dst_image_file):
+    image = Image.fromarray(array)
+
+    if dst_image_file:
+        image.save(dst_image_file)
+
+    return image
+
+
 def convert_512x512_lut_to_pillow_3d_lut_filter(lut_image_file):
     """
     convert_512x512_lut_to_pillow_3d_lut_filter
@@ -21,31 +219,8 @@ def convert_512x512_lut_to_pillow_3d_lut_filter(lut_image_file):
     file:https://github.com/homm/pillow-lut-tools/blob/master/pillow_lut/loaders.py
     
     """
-    
-    lut_image = Image.open(lut_image_file).convert('RGB')
-    
-    if lut_image.size[0] != 512 or lut_image.size[1] != 512:
-        raise ValueError(f"Error: lut image size not equal 512x512: {lut_image.size}")
-    
-    table = np.zeros((512*512, 3), dtype=np.uint8)
-    
-    for r in range(0, 64):
-        for g in range(0, 64):
-            for b in range(0, 64):
-                
-                block_y = b // 8
-                block_x = b % 8
-                
-                cy = 64 * block_y + g
-                cx = 64 * block_x + r
-                
-                idx = r + 64 * g + 64 * 64 * b
-                
-                table[idx] = lut_image.getpixel((cx, cy))
-                
-    table = table.astype(np.float32) / 255.0
-
-    return ImageFilter.Color3DLUT((64, 64, 64), table, target_mode=None, _copy_table=False)
+
+    return convert_lattice_to_pillow_3d_lut_filter(load_lut_image(lut_image_file, 64, "tile", 8))
 
 
 def convert_1024x32_lut_to_pillow_3d_lut_filter(lut_image_file):
@@ -56,28 +231,8 @@ def convert_1024x32_lut_to_pillow_3d_lut_filter(lut_image_file):
     file:https://github.com/homm/pillow-lut-tools/blob/master/pillow_lut/loaders.py
     
     """
-    
-    lut_image = Image.open(lut_image_file).convert('RGB')
-    
-    if lut_image.size[0] != 1024 or lut_image.size[1] != 32:
-        raise ValueError(f"Error: lut image size not equal 1024x32: {lut_image.size}")
-    
-    table = np.zeros((1024*32, 3), dtype=np.uint8)
-    
-    for r in range(0, 32):
-        for g in range(0, 32):
-            for b in range(0, 32):
 
-                cy = g
-                cx = 32 * b + r
-                
-                idx = r + 32 * g + 32 * 32 * b
-                
-                table[idx] = lut_image.getpixel((cx, cy))
-                
-    table = table.astype(np.float32) / 255.0
-
-    return ImageFilter.Color3DLUT((32, 32, 32), table, target_mode=None, _copy_table=False)
+    return convert_lattice_to_pillow_3d_lut_filter(load_lut_image(lut_image_file, 32, "tile", 32))
 
 
 def convert_512x512_lut_to_hald8_image(lut_image_file, dst_hdld8_file = None):
@@ -85,35 +240,9 @@ def convert_512x512_lut_to_hald8_image(lut_image_file, dst_hdld8_file = None):
     convert_512x512_lut_to_hald8_image
     """
 
-    lut_image = Image.open(lut_image_file).convert('RGB')
-    
-    if lut_image.size[0] != 512 or lut_image.size[1] != 512:
-        raise ValueError(f"Error: lut image size not equal 512x512: {lut_image.size}")
-    
-    table = np.zeros((512*512, 3), dtype=np.uint8)
-    
-    for r in range(0, 64):
-        for g in range(0, 64):
-            for b in range(0, 64):
-                
-                block_y = b // 8
-                block_x = b % 8
-                
-                cy = 64 * block_y + g
-                cx = 64 * block_x + r
-                
-                idx = r + 64 * g + 64 * 64 * b
-                
-                table[idx] = lut_image.getpixel((cx, cy))
-                
-    table = table.reshape((512, 512, -1))
-    
-    hald8_image =  Image.fromarray(table)
-    
-    if dst_hdld8_file:
-        hald8_image.save(dst_hdld8_file)
-        
-    return hald8_image
+    lattice = load_lut_image(lut_image_file, 64, "tile", 8)
+
+    return _save_image(convert_lattice_to_hald_image(lattice), dst_hdld8_file)
 
 
 def convert_hald8_image_to_512x512_lut(hald8_image_file, dst_lut_image_file = None):
@@ -121,108 +250,1061 @@ def convert_hald8_image_to_512x512_lut(hald8_image_file, dst_lut_image_file = No
     convert_hald8_image_to_512x512_lut
     """
 
-    hald8_image = Image.open(hald8_image_file).convert('RGB')
-    
-    if hald8_image.size[0] != 512 or hald8_image.size[1] != 512:
-        raise ValueError(f"Error: lut image size not equal 512x512: {hald8_image.size}")
-    
-    table = np.zeros((512, 512, 3), dtype=np.uint8)
-    
-    for r in range(0, 64):
-        for g in range(0, 64):
-            for b in range(0, 64):
-                
-                block_y = b // 8
-                block_x = b % 8
-                
-                cy = 64 * block_y + g
-                cx = 64 * block_x + r
-                
-                idx = r + 64 * g + 64 * 64 * b
-                hy = idx // 512
-                hx = idx % 512
-                
-                table[cy, cx] = hald8_image.getpixel((hx, hy))
-    
-    lut_image =  Image.fromarray(table)
-    
-    if dst_lut_image_file:
-        lut_image.save(dst_lut_image_file)
-        
-    return lut_image
+    lattice = load_lut_image(hald8_image_file, layout="hald")
+
+    if lattice.shape[0] != 64:
+        raise ValueError(f"Error: lut image size not equal 512x512: {lattice.shape[0]}")
+
+    return _save_image(convert_lattice_to_tile_image(lattice, 8), dst_lut_image_file)
 
 
 def generate_identity_512x512_lut(dst_lut_image_file = None):
     """
     generate_identity_512x512_lut
     """
-    
-    table = np.zeros((512, 512, 3), dtype=np.uint8)
-    
-    for r in range(0, 64):
-        for g in range(0, 64):
-            for b in range(0, 64):
-                
-                block_y = b // 8
-                block_x = b % 8
-                
-                cy = 64 * block_y + g
-                cx = 64 * block_x + r
-                
-                table[cy, cx] = (r * 4, g * 4, b * 4)
-    
-    lut_image = Image.fromarray(table)
-    
-    if dst_lut_image_file:
-        lut_image.save(dst_lut_image_file)
-        
-    return lut_image
+
+    return _save_image(convert_lattice_to_tile_image(_generate_legacy_identity_lattice(64), 8), dst_lut_image_file)
 
 def generate_identity_hald8_image(dst_hdld8_file = None):
     """
     generate_identity_hald8_image
     """
 
-    table = np.zeros((512*512, 3), dtype=np.uint8)
-    
-    for r in range(0, 64):
-        for g in range(0, 64):
-            for b in range(0, 64):
-                
-                idx = r + 64 * g + 64 * 64 * b
-                
-                table[idx] = (r * 4, g * 4, b * 4)
-                
-    table = table.reshape((512, 512, -1))
-    
-    hald8_image =  Image.fromarray(table)
-    
-    if dst_hdld8_file:
-        hald8_image.save(dst_hdld8_file)
-        
-    return hald8_image
+    return _save_image(convert_lattice_to_hald_image(_generate_legacy_identity_lattice(64)), dst_hdld8_file)
 
 
-def apply_3d_lut_for_cv_image(cv_image, cube_lut, factor = 1.0):
+#---------------------------------------------------------------------------
+# native lut engine
+#---------------------------------------------------------------------------
+
+# fixed point layout of pillow Color3DLUT (libImaging/ColorLUT.c), kept identical for bit exact output
+_PRECISION_BITS = 16 - 8 - 2
+_PRECISION_ROUNDING = 1 << (_PRECISION_BITS - 1)
+_SCALE_BITS = 32 - 8 - 6
+_SCALE_MASK = (1 << _SCALE_BITS) - 1
+_SHIFT_BITS = 16 - 1
+
+
+def get_lattice(cube_lut):
+    """get float lattice of lut
+
+    Args:
+        cube_lut (ImageFilter.Color3DLUT/np.array): pillow 3d lut filter, or lattice of size3 * size2 * size1 * 3
+                                                    indexed by [b, g, r], uint8 in [0, 255] or float in [0, 1]
+
+    Returns:
+        np.array: float32 lattice indexed by [b, g, r], values of rgb in [0, 1]
     """
-    apply_3d_lut_for_cv_image
+
+    if isinstance(cube_lut, ImageFilter.Color3DLUT):
+        if cube_lut.channels != 3:
+            raise ValueError(f"Error: only 3 channels lut is supported: {cube_lut.channels}")
+
+        size1, size2, size3 = cube_lut.size
+        return np.asarray(cube_lut.table, dtype=np.float32).reshape(size3, size2, size1, 3)
+
+    lattice = np.asarray(cube_lut)
+
+    if lattice.ndim != 4 or lattice.shape[3] != 3:
+        raise ValueError(f"Error: invalid lattice shape: {lattice.shape}")
+
+    if lattice.dtype == np.uint8:
+        return lattice.astype(np.float32) / 255.0
+
+    return lattice.astype(np.float32, copy=False)
+
+
+def _prepare_fixed_point_table(lattice):
+    """int16 table of pillow, value * (255 << 6) rounded away from zero and saturated, flattened to (n, 3) int32
+
+    NOTE: pillow keeps table items as float32, so the product is rounded to float32 as well
+    """
+
+    items = lattice.reshape(-1, 3).astype(np.float32)
+
+    scale = 255 << _PRECISION_BITS
+    products = (items * np.float32(scale)).astype(np.float64)
+
+    table = np.where(items < 0, products - 0.5, products + 0.5)
+    table = np.where(items >= (0x7fff - 0.5) / scale, 0x7fff, table)
+    table = np.where(items <= (-0x8000 + 0.5) / scale, -0x8000, table)
+
+    return np.trunc(table).astype(np.int32)
+
+
+def _interpolate_fixed_point(r, g, b, table, lattice_shape, interpolation):
+    """interpolate uint8 r, g, b planes (flattened) in fixed point, the same as pillow for trilinear"""
+
+    sizes = (lattice_shape[2], lattice_shape[1], lattice_shape[0])
+    offsets = np.array([1, sizes[0], sizes[0] * sizes[1]])
+
+    base = np.zeros(r.shape, dtype=np.intp)
+    shifts = []
+
+    for channel, size, offset in zip((r, g, b), sizes, offsets):
+        # NOTE: float to int conversion without rounding, see pillow
+        scale = np.uint32((size - 1) / 255.0 * (1 << _SCALE_BITS))
+
+        index = channel.astype(np.uint32) * scale
+        base += np.minimum(index >> _SCALE_BITS, size - 2).astype(np.intp) * offset
+        shifts.append(((index & _SCALE_MASK) >> (_SCALE_BITS - _SHIFT_BITS)).astype(np.int32)[:, None])
+
+    one = 1 << _SHIFT_BITS
+
+    if interpolation == "trilinear":
+        def lerp(a, b, shift):
+            return (a * (one - shift) + b * shift) >> _SHIFT_BITS
+
+        result = _interpolate_trilinear(base, shifts, offsets, table, lerp)
+    else:
+        result = _interpolate_tetrahedral(base, np.concatenate(shifts, axis=1), offsets, table, one) >> _SHIFT_BITS
+
+    return np.clip((result + _PRECISION_ROUNDING) >> _PRECISION_BITS, 0, 255)
+
+
+def _interpolate_float(r, g, b, lattice, interpolation):
+    """interpolate float r, g, b planes (flattened) in [0, 1]"""
+
+    sizes = (lattice.shape[2], lattice.shape[1], lattice.shape[0])
+    offsets = np.array([1, sizes[0], sizes[0] * sizes[1]])
+
+    table = lattice.reshape(-1, 3)
+
+    base = np.zeros(r.shape, dtype=np.intp)
+    shifts = []
+
+    for channel, size, offset in zip((r, g, b), sizes, offsets):
+        position = np.clip(channel, 0.0, 1.0).astype(np.float32) * (size - 1)
+        index = np.minimum(position.astype(np.intp), size - 2)
+        base += index * offset
+        shifts.append((position - index)[:, None])
+
+    if interpolation == "trilinear":
+        def lerp(a, b, shift):
+            return a + (b - a) * shift
+
+        return _interpolate_trilinear(base, shifts, offsets, table, lerp)
+
+    return _interpolate_tetrahedral(base, np.concatenate(shifts, axis=1), offsets, table, 1.0)
+
+
+def _interpolate_trilinear(base, shifts, offsets, table, lerp):
+    """trilinear interpolation, r first, then g, then b, in the same order as pillow"""
+
+    shift1, shift2, shift3 = shifts
+    c1, c2, c3 = offsets
+
+    def corner(offset):
+        return np.take(table, base + offset, axis=0)
+
+    left  = lerp(lerp(corner(0),  corner(c1),      shift1),
+                 lerp(corner(c2), corner(c2 + c1), shift1), shift2)
+    right = lerp(lerp(corner(c3),      corner(c3 + c1),      shift1),
+                 lerp(corner(c3 + c2), corner(c3 + c2 + c1), shift1), shift2)
+
+    return lerp(left, right, shift3)
+
+
+def _interpolate_tetrahedral(base, shifts, offsets, table, one):
+    """tetrahedral interpolation, walk from base corner along axes in descending order of fraction"""
+
+    order = np.argsort(-shifts, axis=1, kind="stable")
+    shifts = np.take_along_axis(shifts, order, axis=1)
+    steps = offsets[order]
+
+    vertex1 = base + steps[:, 0]
+    vertex2 = vertex1 + steps[:, 1]
+    vertex3 = vertex2 + steps[:, 2]
+
+    result  = np.take(table, base, axis=0) * (one - shifts[:, 0:1])
+    result += np.take(table, vertex1, axis=0) * (shifts[:, 0:1] - shifts[:, 1:2])
+    result += np.take(table, vertex2, axis=0) * (shifts[:, 1:2] - shifts[:, 2:3])
+    result += np.take(table, vertex3, axis=0) * shifts[:, 2:3]
+
+    return result
+
+
+def apply_lut(image, cube_lut, interpolation="trilinear", channel_order="bgr", out=None, workers=None, tile_rows=64):
+    """apply 3d lut to image array natively, without pillow round trip
+
+    uint8 image is interpolated in the fixed point arithmetic of pillow Color3DLUT, output of trilinear
+    is bit exact to pillow filter. float image in [0, 1] is interpolated in float32.
 
     Args:
-        cv_image (np.array): opencv bgr image
-        cube_lut (ImageFilter.Color3DLUT): 3d cube lut filter of pillow 
-        factor (float, optional): blend factor. Defaults to 1.0.
+        image (np.array): uint8 or float image of size height * width * 3
+        cube_lut (ImageFilter.Color3DLUT/np.array): pillow 3d lut filter or lattice, see get_lattice
+        interpolation (str, optional): "trilinear" or "tetrahedral". Defaults to "trilinear".
+        channel_order (str, optional): "bgr" or "rgb" of image. Defaults to "bgr".
+        out (np.array, optional): output buffer of same shape, uint8 for uint8 image, float32 otherwise. Defaults to None.
+        workers (int, optional): threads processing row tiles, None for cpu count. Defaults to None.
+        tile_rows (int, optional): rows of each tile. Defaults to 64.
 
     Returns:
-        res_image: opencv bgr image
+        np.array: result image, the same object as out if given
     """
-    
-    pillow_image = Image.fromarray(cv_image[:,:,::-1]) # bgr --> rgb
 
-    lut_pillow_image = pillow_image.filter(cube_lut)
-    
-    lut_image = np.asarray(lut_pillow_image)[:,:,::-1] # rgb --> bgr
-    
-    res_image = cv_image * (1.0 - factor) + lut_image * factor
+    if interpolation not in ("trilinear", "tetrahedral"):
+        raise ValueError(f"Error: unsupported interpolation: {interpolation}")
+
+    if channel_order not in ("bgr", "rgb"):
+        raise ValueError(f"Error: unsupported channel order: {channel_order}")
+
+    if image.ndim != 3 or image.shape[2] != 3:
+        raise ValueError(f"Error: image should be of size height * width * 3: {image.shape}")
+
+    lattice = get_lattice(cube_lut)
+
+    if min(lattice.shape[:3]) < 2:
+        raise ValueError(f"Error: lattice size should be at least 2: {lattice.shape}")
+
+    fixed_point = image.dtype == np.uint8
+    out_dtype = np.uint8 if fixed_point else np.float32
+
+    if out is None:
+        out = np.empty(image.shape, dtype=out_dtype)
+    elif out.shape != image.shape or out.dtype != out_dtype:
+        raise ValueError(f"Error: out should be {np.dtype(out_dtype)} of shape {image.shape}")
+
+    table = _prepare_fixed_point_table(lattice) if fixed_point else None
+
+    r_channel, b_channel = (2, 0) if channel_order == "bgr" else (0, 2)
+
+    def process(start):
+        stop = min(start + tile_rows, image.shape[0])
+
+        tile = image[start:stop].reshape(-1, 3)
+        r, g, b = tile[:, r_channel], tile[:, 1], tile[:, b_channel]
+
+        if fixed_point:
+            result = _interpolate_fixed_point(r, g, b, table, lattice.shape, interpolation)
+        else:
+            result = _interpolate_float(r, g, b, lattice, interpolation)
+
+        _store_rgb_tile(out, start, stop, result, r_channel, b_channel)
+
+    _process_row_tiles(image.shape[0], tile_rows, workers, process)
+
+    return out
+
+
+def _store_rgb_tile(out, start, stop, result, r_channel, b_channel):
+    """store flattened rgb result of rows [start, stop) into out of channel order given by r/b channel"""
+
+    out_tile = out[start:stop].reshape(-1, 3) if out.flags.c_contiguous else None
+    if out_tile is None:
+        out[start:stop] = result[:, [r_channel, 1, b_channel]].reshape(stop - start, -1, 3)
+    else:
+        out_tile[:, r_channel] = result[:, 0]
+        out_tile[:, 1] = result[:, 1]
+        out_tile[:, b_channel] = result[:, 2]
+
+
+def _process_row_tiles(rows, tile_rows, workers, process):
+    """call process(start) for each row tile, in thread pool if workers > 1"""
+
+    starts = range(0, rows, tile_rows)
+    workers = os.cpu_count() if workers is None else workers
+
+    if workers <= 1 or len(starts) <= 1:
+        for start in starts:
+            process(start)
+    else:
+        with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+            list(executor.map(process, starts))
+
+
+#---------------------------------------------------------------------------
+# lut algebra, compose chains of luts into one lattice
+#---------------------------------------------------------------------------
+
+def _apply_color_matrix(rgb, matrix, matrix_order):
+    """apply 3 * 3 color matrix to flattened rgb in [0, 1], clipped to [0, 1]"""
+
+    matrix = np.asarray(matrix, dtype=np.float32)
+
+    if matrix.shape != (3, 3):
+        raise ValueError(f"Error: color matrix should be 3 * 3: {matrix.shape}")
+
+    if matrix_order == "bgr":
+        matrix = matrix[::-1, ::-1]
+    elif matrix_order != "rgb":
+        raise ValueError(f"Error: unsupported matrix order: {matrix_order}")
+
+    return np.clip(rgb @ matrix.T, 0.0, 1.0)
+
+
+def compose_luts(cube_luts, factors=None, pre_matrix=None, post_matrix=None, matrix_order="rgb",
+                 size=None, interpolation="trilinear"):
+    """compose chain of luts, blend factors and color matrices into one lattice
+
+    result = post_matrix(lut_n(... lut_1(pre_matrix(x)))), where lut_i with factor f_i is the identity
+    blend x * (1 - f_i) + lut_i(x) * f_i of apply_3d_lut_for_cv_image. Color matrices are clipped to [0, 1].
+
+    e.g., rectify bt709 video read by opencv, then technical lut, then half strength look:
+
+        lattice = compose_luts([technical_lut, look_lut], factors=[1.0, 0.5],
+                               pre_matrix=opencv.get_bt709_rectify_matrix(), matrix_order="bgr")
+        res_image = apply_lut(bgr_image, lattice)
+
+    Args:
+        cube_luts (list): pillow 3d lut filters or lattices, see get_lattice, applied in order
+        factors (list, optional): blend factor of each lut. Defaults to None, i.e., all 1.0.
+        pre_matrix (np.array, optional): 3 * 3 color matrix applied before luts. Defaults to None.
+        post_matrix (np.array, optional): 3 * 3 color matrix applied after luts. Defaults to None.
+        matrix_order (str, optional): "rgb" or "bgr", channel order of matrix rows and columns. Defaults to "rgb".
+        size (int, optional): size of composed lattice. Defaults to None, i.e., largest lut size, or 33 if no lut.
+        interpolation (str, optional): "trilinear" or "tetrahedral" to evaluate each lut. Defaults to "trilinear".
+
+    Returns:
+        np.array: float32 lattice of size * size * size * 3 indexed by [b, g, r], values of rgb in [0, 1]
+
+    Note: each lut is evaluated in float at the nodes of composed lattice, without the uint8 rounding
+          between steps of chained apply_3d_lut_for_cv_image, results mostly differ within 1 LSB.
+    """
+
+    if interpolation not in ("trilinear", "tetrahedral"):
+        raise ValueError(f"Error: unsupported interpolation: {interpolation}")
+
+    lattices = [get_lattice(cube_lut) for cube_lut in cube_luts]
+    factors = [1.0] * len(lattices) if factors is None else list(factors)
+
+    if len(factors) != len(lattices):
+        raise ValueError(f"Error: {len(factors)} factors for {len(lattices)} luts")
+
+    for lattice in lattices:
+        if min(lattice.shape[:3]) < 2:
+            raise ValueError(f"Error: lattice size should be at least 2: {lattice.shape}")
+
+    if size is None:
+        size = max((max(lattice.shape[:3]) for lattice in lattices), default=33)
+
+    values = np.linspace(0.0, 1.0, size, dtype=np.float32)
+
+    rgb = np.empty((size, size, size, 3), dtype=np.float32)
+    rgb[..., 0] = values[None, None, :]
+    rgb[..., 1] = values[None, :, None]
+    rgb[..., 2] = values[:, None, None]
+    rgb = rgb.reshape(-1, 3)
+
+    if pre_matrix is not None:
+        rgb = _apply_color_matrix(rgb, pre_matrix, matrix_order)
+
+    for lattice, factor in zip(lattices, factors):
+        result = _interpolate_float(rgb[:, 0], rgb[:, 1], rgb[:, 2], lattice, interpolation)
+
+        if factor != 1.0:
+            result = rgb * np.float32(1.0 - factor) + result * np.float32(factor)
+
+        rgb = result
+
+    if post_matrix is not None:
+        rgb = _apply_color_matrix(rgb, post_matrix, matrix_order)
+
+    return np.ascontiguousarray(rgb, dtype=np.float32).reshape(size, size, size, 3)
+
+
+#---------------------------------------------------------------------------
+# cube lut file
+#---------------------------------------------------------------------------
+
+def _normalize_domain(rgb, domain):
+    """map flattened rgb from domain [min, max] to [0, 1], clipped"""
+
+    low, high = domain
+    return np.clip((rgb - low) / (high - low), 0.0, 1.0)
+
+
+def convert_cube_to_lattice(cube_data, size=None, interpolation="trilinear"):
+    """convert parsed .cube lut to lattice of [0, 1] input
+
+    lut_3d of default domain is returned as is, otherwise 1d shaper, domains and 3d lut are
+    evaluated at the nodes of a new lattice.
+
+    Args:
+        cube_data (dict): parsed lut, see cube.parse_cube
+        size (int, optional): size of evaluated lattice. Defaults to None, i.e., size of lut_3d, at least 33.
+        interpolation (str, optional): "trilinear" or "tetrahedral" of lut_3d. Defaults to "trilinear".
+
+    Returns:
+        np.array: float32 lattice of size * size * size * 3 indexed by [b, g, r], values of rgb
+    """
+
+    lut_1d, lut_3d = cube_data["lut_1d"], cube_data["lut_3d"]
+
+    default_domain = np.array([[0, 0, 0], [1, 1, 1]], dtype=np.float32)
+
+    if lut_1d is None and np.array_equal(cube_data["domain_3d"], default_domain):
+        return lut_3d
+
+    if size is None:
+        size = 33 if lut_3d is None else max(lut_3d.shape[0], 33)
+
+    values = np.linspace(0.0, 1.0, size, dtype=np.float32)
+
+    rgb = np.empty((size, size, size, 3), dtype=np.float32)
+    rgb[..., 0] = values[None, None, :]
+    rgb[..., 1] = values[None, :, None]
+    rgb[..., 2] = values[:, None, None]
+    rgb = rgb.reshape(-1, 3)
+
+    if lut_1d is not None:
+        rgb = _normalize_domain(rgb, cube_data["domain_1d"])
+        positions = np.linspace(0.0, 1.0, len(lut_1d), dtype=np.float32)
+
+        rgb = np.stack([np.interp(rgb[:, i], positions, lut_1d[:, i]) for i in (0, 1, 2)], axis=1).astype(np.float32)
+
+    if lut_3d is not None:
+        rgb = _normalize_domain(rgb, cube_data["domain_3d"])
+        rgb = _interpolate_float(rgb[:, 0], rgb[:, 1], rgb[:, 2], lut_3d, interpolation)
+
+    return np.ascontiguousarray(rgb, dtype=np.float32).reshape(size, size, size, 3)
+
+
+def load_lut_file(lut_file, size=64, layout="tile", tiles_per_row=None):
+    """load lut of .cube file, through the parsed lut cache of cube.load_cube_file, or lut image
+
+    Args:
+        lut_file (str): .cube file or lut image file
+        size (int, optional): lattice size of lut image, see load_lut_image. Defaults to 64.
+        layout (str, optional): layout of lut image, see load_lut_image. Defaults to "tile".
+        tiles_per_row (int, optional): tiles per row of lut image, see load_lut_image. Defaults to None.
+
+    Returns:
+        np.array: lattice indexed by [b, g, r], float32 for .cube, uint8 for lut image, see get_lattice
+    """
+
+    if cube.is_cube_file(lut_file):
+        return convert_cube_to_lattice(cube.load_cube_file(lut_file))
+
+    return load_lut_image(lut_file, size, layout, tiles_per_row)
+
+
+def save_cube_file(cube_lut, cube_file, title=None):
+    """save pillow 3d lut filter or lattice as .cube file
+
+    Args:
+        cube_lut (ImageFilter.Color3DLUT/np.array): pillow 3d lut filter or lattice, see get_lattice
+        cube_file (str): .cube file
+        title (str, optional): title. Defaults to None.
+    """
+
+    lattice = get_lattice(cube_lut)
+
+    if len(set(lattice.shape[:3])) != 1:
+        raise ValueError(f"Error: .cube lut should be of same size on each axis: {lattice.shape}")
+
+    cube.write_cube_file(cube_file, lut_3d=lattice, title=title)
+
+
+#---------------------------------------------------------------------------
+# baked lut, dense table of all 256^3 uint8 colors
+#---------------------------------------------------------------------------
+
+# dense: uint8 table of 256 * 256 * 256 * 3 (48 MB), packed: little endian uint32 table of 256 * 256 * 256 (64 MB),
+# each item r | g << 8 | b << 16. Both are indexed by [b, g, r], i.e., flattened by 24-bit index r | g << 8 | b << 16
+BAKED_LUT_LAYOUTS = ("dense", "packed")
+
+BAKED_LUT_SUFFIX = ".npy"
+
+
+def get_baked_lut_filename(cache_dir, cube_lut, interpolation="trilinear", layout="dense", color_space="rgb"):
+    """get cache file name of baked lut, named by digest of lattice
+
+    Args:
+        cache_dir (str): cache directory
+        cube_lut (ImageFilter.Color3DLUT/np.array): pillow 3d lut filter or lattice, see get_lattice
+        interpolation (str, optional): "trilinear" or "tetrahedral". Defaults to "trilinear".
+        layout (str, optional): "dense" or "packed". Defaults to "dense".
+        color_space (str, optional): "rgb", or e.g. "yuv_bt709_limited" of bake_yuv_lut. Defaults to "rgb".
+
+    Returns:
+        str: file name
+    """
+
+    lattice = np.ascontiguousarray(get_lattice(cube_lut))
+
+    digest = hashlib.sha1(str(lattice.shape).encode("ascii"))
+    digest.update(lattice.data)
+
+    name = f"lut_{digest.hexdigest()}_{interpolation}_{layout}"
+    if color_space != "rgb":
+        name += f"_{color_space}"
+
+    return os.path.join(cache_dir, name + BAKED_LUT_SUFFIX)
+
+
+def load_baked_lut(baked_lut_file):
+    """load baked lut, memory mapped read-only, so that processes loading the same file share one copy
+
+    Args:
+        baked_lut_file (str): baked lut .npy file
+
+    Returns:
+        np.memmap: baked lut
+    """
+
+    baked = np.load(baked_lut_file, mmap_mode="r")
+
+    if baked.shape not in ((256, 256, 256, 3), (256, 256, 256)):
+        raise ValueError(f"Error: invalid baked lut shape: {baked.shape}")
+
+    return baked
+
+
+def save_baked_lut(baked, baked_lut_file):
+    """save baked lut atomically, concurrent writers of the same file do not corrupt it"""
+
+    temp_file = f"{baked_lut_file}.{os.getpid()}.tmp{BAKED_LUT_SUFFIX}"
+
+    np.save(temp_file, baked)
+    os.replace(temp_file, baked_lut_file)
+
+
+def bake_lut(cube_lut, interpolation="trilinear", layout="dense", cache_dir=None, workers=None):
+    """bake lut into dense table of all 256^3 uint8 colors, see apply_baked_lut
+
+    Args:
+        cube_lut (ImageFilter.Color3DLUT/np.array): pillow 3d lut filter or lattice, see get_lattice
+        interpolation (str, optional): "trilinear" or "tetrahedral", see apply_lut. Defaults to "trilinear".
+        layout (str, optional): "dense" or "packed", see BAKED_LUT_LAYOUTS. Defaults to "dense".
+        cache_dir (str, optional): directory to cache baked table, loaded by memory map if cached. Defaults to None.
+        workers (int, optional): threads of baking, see apply_lut. Defaults to None.
+
+    Returns:
+        np.array: baked lut, read-only np.memmap if cache_dir given
+    """
+
+    def evaluate(colors):
+        # NOTE: in place, each row tile is read before written
+        apply_lut(colors, cube_lut, interpolation, channel_order="rgb", out=colors, workers=workers, tile_rows=1024)
+
+    baked_lut_file = None if cache_dir is None else get_baked_lut_filename(cache_dir, cube_lut, interpolation, layout)
+
+    return _bake_table(evaluate, layout, baked_lut_file)
+
+
+def _bake_table(evaluate, layout, baked_lut_file):
+    """bake table of all 256^3 colors, or load it from baked_lut_file if cached
+
+    Args:
+        evaluate (callable): evaluate(colors) maps uint8 colors of 65536 rows of 256 pixels in place,
+                             pixel [c2 * 256 + c1, c0] is color (c0, c1, c2)
+        layout (str): "dense" or "packed"
+        baked_lut_file (str): cache file, None not to cache
+
+    Returns:
+        np.array: baked table, read-only np.memmap if cached
+    """
+
+    if layout not in BAKED_LUT_LAYOUTS:
+        raise ValueError(f"Error: unsupported baked lut layout: {layout}")
+
+    if baked_lut_file is not None and os.path.exists(baked_lut_file):
+        return load_baked_lut(baked_lut_file)
+
+    values = np.arange(256, dtype=np.uint8)
+
+    colors = np.empty((256, 256, 256, 3), dtype=np.uint8)
+    colors[..., 0] = values[None, None, :]
+    colors[..., 1] = values[None, :, None]
+    colors[..., 2] = values[:, None, None]
+
+    evaluate(colors.reshape(-1, 256, 3))
+
+    if layout == "dense":
+        baked = colors
+    else:
+        packed = np.zeros((256, 256, 256, 4), dtype=np.uint8)
+        packed[..., :3] = colors
+        baked = packed.view("<u4")[..., 0]
+
+    if baked_lut_file is None:
+        return baked
+
+    os.makedirs(os.path.dirname(baked_lut_file) or ".", exist_ok=True)
+    save_baked_lut(baked, baked_lut_file)
+
+    return load_baked_lut(baked_lut_file)
+
+
+def apply_baked_lut(image, baked, channel_order="bgr", out=None, workers=None, tile_rows=64):
+    """apply baked lut to uint8 image, one gather per pixel without interpolation
+
+    Args:
+        image (np.array): uint8 image of size height * width * 3
+        baked (np.array): baked lut, see bake_lut
+        channel_order (str, optional): "bgr" or "rgb" of image. Defaults to "bgr".
+        out (np.array, optional): uint8 output buffer of same shape. Defaults to None.
+        workers (int, optional): threads processing row tiles, None for cpu count. Defaults to None.
+        tile_rows (int, optional): rows of each tile. Defaults to 64.
+
+    Returns:
+        np.array: result image, the same object as out if given
+    """
+
+    if channel_order not in ("bgr", "rgb"):
+        raise ValueError(f"Error: unsupported channel order: {channel_order}")
+
+    if image.dtype != np.uint8 or image.ndim != 3 or image.shape[2] != 3:
+        raise ValueError(f"Error: image should be uint8 of size height * width * 3: {image.dtype} {image.shape}")
+
+    if out is None:
+        out = np.empty(image.shape, dtype=np.uint8)
+    elif out.shape != image.shape or out.dtype != np.uint8:
+        raise ValueError(f"Error: out should be uint8 of shape {image.shape}")
+
+    if baked.shape == (256, 256, 256, 3):
+        table = baked.reshape(-1, 3)
+    elif baked.shape == (256, 256, 256):
+        table = baked.reshape(-1)
+    else:
+        raise ValueError(f"Error: invalid baked lut shape: {baked.shape}")
+
+    r_channel, b_channel = (2, 0) if channel_order == "bgr" else (0, 2)
+
+    def process(start):
+        stop = min(start + tile_rows, image.shape[0])
+
+        tile = image[start:stop].reshape(-1, 3)
+
+        index = tile[:, b_channel].astype(np.intp) << 16
+        index |= tile[:, 1].astype(np.intp) << 8
+        index |= tile[:, r_channel]
+
+        if table.ndim == 2:
+            result = np.take(table, index, axis=0)
+        else:
+            result = np.take(table, index).astype("<u4", copy=False).view(np.uint8).reshape(-1, 4)
+
+        _store_rgb_tile(out, start, stop, result, r_channel, b_channel)
+
+    _process_row_tiles(image.shape[0], tile_rows, workers, process)
+
+    return out
+
+
+#---------------------------------------------------------------------------
+# yuv domain lut, yuv --> rgb --> lut --> yuv fused into one table
+#---------------------------------------------------------------------------
+
+def compose_yuv_lut(cube_lut, standard="bt709", range="limited", size=None, interpolation="trilinear"):
+    """compose yuv --> rgb, lut and rgb --> yuv into one lattice of yuv input
+
+    Args:
+        cube_lut (ImageFilter.Color3DLUT/np.array): grading lut of rgb, pillow 3d lut filter or lattice, see get_lattice
+        standard (str, optional): "bt709" or "bt601", see yuv.get_affine_transform. Defaults to "bt709".
+        range (str, optional): "limited" or "full". Defaults to "limited".
+        size (int, optional): size of composed lattice. Defaults to None, i.e., lut size, at least 33.
+        interpolation (str, optional): "trilinear" or "tetrahedral" to evaluate lut. Defaults to "trilinear".
+
+    Returns:
+        np.array: float32 lattice indexed by [v, u, y], values of (y, u, v) / 255
+    """
+
+    lattice = get_lattice(cube_lut)
+
+    if size is None:
+        size = max(max(lattice.shape[:3]), 33)
+
+    values = np.linspace(0.0, 255.0, size, dtype=np.float32)
+
+    yuv_pixels = np.empty((size, size, size, 3), dtype=np.float32)
+    yuv_pixels[..., 0] = values[None, None, :]
+    yuv_pixels[..., 1] = values[None, :, None]
+    yuv_pixels[..., 2] = values[:, None, None]
+
+    rgb = yuv.convert(yuv_pixels, "yuv", "rgb", standard, range) / np.float32(255.0)
+    rgb = _interpolate_float(rgb[..., 0].ravel(), rgb[..., 1].ravel(), rgb[..., 2].ravel(), lattice, interpolation)
+
+    yuv_pixels = yuv.convert(np.clip(rgb, 0.0, 1.0) * np.float32(255.0), "rgb", "yuv", standard, range)
+
+    return (yuv_pixels / np.float32(255.0)).reshape(size, size, size, 3)
+
+
+def bake_yuv_lut(cube_lut, standard="bt709", range="limited", interpolation="trilinear", layout="packed", cache_dir=None):
+    """bake yuv --> rgb, lut and rgb --> yuv of all 256^3 yuv colors into one table, see apply_yuv_lut_to_i420
+
+    Each yuv color is converted exactly as yuv.convert_i420_to_bgr, lut by apply_lut and yuv.convert_bgr_to_i420 do,
+    without resampling on a composed lattice.
+
+    Args:
+        cube_lut (ImageFilter.Color3DLUT/np.array): grading lut of rgb, pillow 3d lut filter or lattice, see get_lattice
+        standard (str, optional): "bt709" or "bt601". Defaults to "bt709".
+        range (str, optional): "limited" or "full". Defaults to "limited".
+        interpolation (str, optional): "trilinear" or "tetrahedral", see apply_lut. Defaults to "trilinear".
+        layout (str, optional): "dense" or "packed", see BAKED_LUT_LAYOUTS. Defaults to "packed".
+        cache_dir (str, optional): directory to cache baked table, loaded by memory map if cached. Defaults to None.
+
+    Returns:
+        np.array: baked table indexed by [v, u, y], values of (y, u, v), read-only np.memmap if cache_dir given
+    """
+
+    lattice = get_lattice(cube_lut)
+
+    def evaluate(colors):
+        for start, stop in yuv.iter_blocks(colors.shape[0], 1024):
+            tile = colors[start:stop]
+
+            rgb = yuv.convert(tile, "yuv", "rgb", standard, range, dtype=np.uint8)
+            apply_lut(rgb, lattice, interpolation, channel_order="rgb", out=rgb, workers=1)
+            yuv.convert(rgb, "rgb", "yuv", standard, range, out=tile)
+
+    baked_lut_file = None
+    if cache_dir is not None:
+        baked_lut_file = get_baked_lut_filename(cache_dir, lattice, interpolation, layout,
+                                                color_space=f"yuv_{standard}_{range}".lower())
+
+    return _bake_table(evaluate, layout, baked_lut_file)
+
+
+def _lookup_yuv(y_samples, chroma_index, yuv_lut):
+    """look up (y, u, v) of luma samples and their chroma, chroma_index is u << 8 | v << 16 for baked table"""
+
+    if yuv_lut.dtype == np.uint32 or yuv_lut.shape == (256, 256, 256):
+        items = np.take(yuv_lut.reshape(-1), y_samples.astype(np.intp) | chroma_index)
+        return items & 0xff, (items >> 8) & 0xff, items >> 16
+
+    if yuv_lut.shape == (256, 256, 256, 3) and yuv_lut.dtype == np.uint8:
+        items = np.take(yuv_lut.reshape(-1, 3), y_samples.astype(np.intp) | chroma_index, axis=0)
+        return items[..., 0], items[..., 1], items[..., 2]
+
+    # NOTE: lattice of compose_yuv_lut, interpolated as 444 pixels
+    u_samples = (chroma_index >> 8) & 0xff
+    v_samples = chroma_index >> 16
+
+    pixels = np.stack(np.broadcast_arrays(y_samples, u_samples, v_samples), axis=-1).astype(np.uint8)
+    items = apply_lut(pixels, yuv_lut, channel_order="rgb", workers=1)
+
+    return items[..., 0], items[..., 1], items[..., 2]
+
+
+def apply_yuv_lut_to_i420(yuv_420_image, yuv_lut, out=None):
+    """apply yuv lut to i420 image directly, without bgr intermediate
+
+    Each luma sample is looked up with its shared chroma sample, output chroma is the rounded mean
+    of the 2x2 outputs, i.e., box filter as yuv.convert_bgr_to_i420 does.
+
+    Args:
+        yuv_420_image (np.array): uint8 yuv 420 image of size (height * 3 / 2) * width
+        yuv_lut (np.array): baked table of bake_yuv_lut, or lattice of compose_yuv_lut
+        out (np.array, optional): C-contiguous uint8 output buffer of same shape. Defaults to None.
+
+    Returns:
+        np.array: uint8 yuv 420 image, the same object as out if given
+    """
+
+    y_plane, u_plane, v_plane = yuv.split_i420_planes(yuv_420_image)
+
+    if out is None:
+        out = np.empty(yuv_420_image.shape, dtype=np.uint8)
+    elif out.shape != yuv_420_image.shape or out.dtype != np.uint8 or not out.flags.c_contiguous:
+        raise ValueError(f"Error: out should be C-contiguous uint8 of shape {yuv_420_image.shape}")
+
+    out_y_plane, out_u_plane, out_v_plane = yuv.split_i420_planes(out)
+
+    for start, stop in yuv.iter_blocks(u_plane.shape[0], yuv.I420_BLOCK_ROWS):
+        chroma_index = (u_plane[start:stop].astype(np.intp) << 8) | (v_plane[start:stop].astype(np.intp) << 16)
+
+        y_block = y_plane[2 * start: 2 * stop]
+        out_y_block = out_y_plane[2 * start: 2 * stop]
+
+        u_sum = np.full(chroma_index.shape, 2, dtype=np.uint16)
+        v_sum = np.full(chroma_index.shape, 2, dtype=np.uint16)
+
+        for dy in (0, 1):
+            for dx in (0, 1):
+                y_items, u_items, v_items = _lookup_yuv(y_block[dy::2, dx::2], chroma_index, yuv_lut)
+
+                out_y_block[dy::2, dx::2] = y_items
+                u_sum += u_items.astype(np.uint16)
+                v_sum += v_items.astype(np.uint16)
+
+        out_u_plane[start:stop] = u_sum >> 2
+        out_v_plane[start:stop] = v_sum >> 2
+
+    return out
+
+
+#---------------------------------------------------------------------------
+# batch lut application
+#---------------------------------------------------------------------------
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp", ".tif", ".tiff", ".webp")
+
+# lut of batch worker process, loaded once by _init_batch_worker
+_BATCH_LUT = None
+
+
+def _init_batch_worker(lut_source):
+    """load lut of worker, baked lut file is memory mapped, so that all workers share one copy"""
+
+    global _BATCH_LUT
+    _BATCH_LUT = load_baked_lut(lut_source) if isinstance(lut_source, str) else lut_source
+
+
+def _apply_batch_lut(bgr_image, out=None):
+    if _BATCH_LUT.dtype == np.float32:
+        return apply_lut(bgr_image, _BATCH_LUT, out=out, workers=1)
+
+    return apply_baked_lut(bgr_image, _BATCH_LUT, out=out, workers=1)
+
+
+def _get_lut_mtime(cube_lut):
+    """mtime of lut file, 0 if lut is not file"""
+
+    return os.path.getmtime(cube_lut) if isinstance(cube_lut, str) else 0
+
+
+def _prepare_batch_lut(cube_lut, factor, bake, cache_dir, yuv_color=None):
+    """get lut source of workers, baked lut file name or float lattice, of yuv domain if yuv_color (standard, range) given"""
+
+    if isinstance(cube_lut, str):
+        cube_lut = load_lut_file(cube_lut)
+
+    lattice = get_lattice(cube_lut)
+
+    if factor != 1.0:
+        lattice = compose_luts([lattice], [factor], size=max(lattice.shape[:3]))
+
+    if yuv_color is not None:
+        standard, yuv_range = yuv_color
+
+        if not bake:
+            return compose_yuv_lut(lattice, standard, yuv_range)
+
+        bake_yuv_lut(lattice, standard, yuv_range, cache_dir=cache_dir)
+
+        return get_baked_lut_filename(cache_dir, lattice, layout="packed", color_space=f"yuv_{standard}_{yuv_range}".lower())
+
+    if not bake:
+        return lattice
+
+    bake_lut(lattice, cache_dir=cache_dir)
+
+    return get_baked_lut_filename(cache_dir, lattice)
+
+
+def _is_up_to_date(dst_file, src_mtime):
+    return os.path.exists(dst_file) and os.path.getmtime(dst_file) >= src_mtime
+
+
+def _get_temp_filename(dst_file):
+    """temp file of same extension, as writers choose format by it, renamed to dst_file when complete"""
+
+    root, ext = os.path.splitext(dst_file)
+    return f"{root}.tmp{os.getpid()}{ext}"
+
+
+def _run_batch(tasks, lut_source, workers):
+    """run tasks [(function, args)] in process pool, each worker loading lut once, returns results in order"""
+
+    workers = os.cpu_count() if workers is None else workers
+
+    if workers <= 1 or len(tasks) <= 1:
+        global _BATCH_LUT
+
+        _init_batch_worker(lut_source)
+        try:
+            return [function(*args) for function, args in tasks]
+        finally:
+            _BATCH_LUT = None
+
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers, initializer=_init_batch_worker,
+                                                initargs=(lut_source,)) as executor:
+        futures = [executor.submit(function, *args) for function, args in tasks]
+        return [future.result() for future in futures]
+
+
+def _report_throughput(name, stats, start, verbose):
+    stats["seconds"] = time.perf_counter() - start
+    stats["megapixels_per_second"] = stats["pixels"] / 1e6 / max(stats["seconds"], 1e-9)
+
+    if verbose:
+        print(f"{name}: {stats['processed']} processed, {stats['skipped']} up to date, "
+              f"{stats['pixels'] / 1e6:.1f} MP in {stats['seconds']:.2f} s, {stats['megapixels_per_second']:.1f} MP/s")
+
+    return stats
+
+
+def _apply_to_image_file(src_file, dst_file):
+    """apply worker lut to image file, returns pixel count"""
+
+    bgr_image = cv2.imread(src_file, cv2.IMREAD_COLOR)
+
+    if bgr_image is None:
+        raise IOError(f"Error: failed to read image: {src_file}")
+
+    os.makedirs(os.path.dirname(dst_file) or ".", exist_ok=True)
+
+    # NOTE: written to temp file and renamed, interrupted output is never taken as up to date
+    temp_file = _get_temp_filename(dst_file)
+
+    if not cv2.imwrite(temp_file, _apply_batch_lut(bgr_image, out=bgr_image)):
+        raise IOError(f"Error: failed to write image: {dst_file}")
+
+    os.replace(temp_file, dst_file)
+
+    return bgr_image.shape[0] * bgr_image.shape[1]
+
+
+def apply_to_folder(src_dir, dst_dir, cube_lut, workers=None, factor=1.0, extensions=IMAGE_EXTENSIONS,
+                    bake=True, cache_dir=None, verbose=True):
+    """apply lut to all images of folder in process pool, written to the same relative paths of dst_dir
+
+    Resumable, images whose output is newer than both image and lut file are skipped.
+
+    Args:
+        src_dir (str): source image directory, searched recursively
+        dst_dir (str): destination image directory
+        cube_lut (str/ImageFilter.Color3DLUT/np.array): lut file, see load_lut_file, pillow 3d lut filter or lattice
+        workers (int, optional): worker processes, None for cpu count. Defaults to None.
+        factor (float, optional): blend factor, folded into lut, see compose_luts. Defaults to 1.0.
+        extensions (tuple, optional): image extensions. Defaults to IMAGE_EXTENSIONS.
+        bake (bool, optional): bake lut, see bake_lut, memory mapped by workers. Defaults to True.
+        cache_dir (str, optional): baked lut cache directory. Defaults to None, i.e., temporary directory.
+        verbose (bool, optional): print throughput. Defaults to True.
+
+    Returns:
+        dict: processed, skipped (image counts), pixels, seconds and megapixels_per_second
+
+    Note: images are read as 8-bit bgr, alpha channel is dropped.
+    """
+
+    start = time.perf_counter()
+
+    lut_mtime = _get_lut_mtime(cube_lut)
+
+    tasks = []
+    skipped = 0
+
+    for src_file in sorted(path.get_all_files_with_extension(src_dir, tuple(extensions))):
+        dst_file = os.path.join(dst_dir, os.path.relpath(src_file, src_dir))
+
+        if _is_up_to_date(dst_file, max(os.path.getmtime(src_file), lut_mtime)):
+            skipped += 1
+        else:
+            tasks.append((_apply_to_image_file, (src_file, dst_file)))
+
+    pixels = 0
+
+    if tasks:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            lut_source = _prepare_batch_lut(cube_lut, factor, bake, cache_dir or temp_dir)
+            pixels = sum(_run_batch(tasks, lut_source, workers))
+
+    stats = {"processed": len(tasks), "skipped": skipped, "pixels": pixels}
+
+    return _report_throughput("apply_to_folder", stats, start, verbose)
+
+
+def _apply_to_yuv_frames(src_yuv, dst_yuv, start, stop):
+    """apply worker yuv lut to frames [start, stop) of i420 src_yuv, written by index into preallocated dst_yuv"""
+
+    reader = yuv_reader.YuvReader(src_yuv, mmap=True)
+    width, height = reader.get_width(), reader.get_height()
+
+    frame = np.empty((height * 3 // 2, width), dtype=np.uint8)
+
+    with yuv_writer.YuvWriter(dst_yuv, width=width, height=height, fps=reader.get_fps() or "25:1",
+                              frame_num=len(reader)) as writer:
+        for idx in range(start, stop):
+            writer.write_frame_at(idx, apply_yuv_lut_to_i420(reader.get_frame(idx), _BATCH_LUT, out=frame))
+
+    reader.close()
+
+    return (stop - start) * width * height
+
+
+def apply_to_yuv(src_yuv, dst_yuv, cube_lut, standard="bt709", range="limited", workers=None, factor=1.0,
+                 frames_per_task=16, bake=True, cache_dir=None, verbose=True):
+    """apply lut to i420 yuv / y4m sequence, frame ranges are processed in process pool and written by index
+
+    Frames are graded in yuv domain by apply_yuv_lut_to_i420, with the lut fused with yuv conversions
+    by bake_yuv_lut, or compose_yuv_lut if not bake.
+
+    Resumable at file level, skipped if dst_yuv is newer than both src_yuv and lut file. Frames are
+    written to a temp file renamed to dst_yuv when complete.
+
+    Args:
+        src_yuv (str): source i420 yuv file of name containing _WxH., or y4m file
+        dst_yuv (str): destination yuv file of the same size, or y4m file
+        cube_lut (str/ImageFilter.Color3DLUT/np.array): lut file, see load_lut_file, pillow 3d lut filter or lattice
+        standard (str, optional): "bt709" or "bt601", see bake_yuv_lut. Defaults to "bt709".
+        range (str, optional): "limited" or "full". Defaults to "limited".
+        workers (int, optional): worker processes, None for cpu count. Defaults to None.
+        factor (float, optional): blend factor, folded into lut, see compose_luts. Defaults to 1.0.
+        frames_per_task (int, optional): frames of each task. Defaults to 16.
+        bake (bool, optional): bake lut, see bake_yuv_lut, memory mapped by workers. Defaults to True.
+        cache_dir (str, optional): baked lut cache directory. Defaults to None, i.e., temporary directory.
+        verbose (bool, optional): print throughput. Defaults to True.
+
+    Returns:
+        dict: processed, skipped (frame counts), pixels, seconds and megapixels_per_second
+    """
+
+    start = time.perf_counter()
+
+    reader = yuv_reader.YuvReader(src_yuv)
+    frame_num, width, height, fps = len(reader), reader.get_width(), reader.get_height(), reader.get_fps()
+    pix_fmt = reader.get_pixel_format().name
+    reader.close()
+
+    if pix_fmt != "i420":
+        raise ValueError(f"Error: only i420 yuv is supported: {pix_fmt}")
+
+    if _is_up_to_date(dst_yuv, max(os.path.getmtime(src_yuv), _get_lut_mtime(cube_lut))):
+        stats = {"processed": 0, "skipped": frame_num, "pixels": 0}
+        return _report_throughput("apply_to_yuv", stats, start, verbose)
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        lut_source = _prepare_batch_lut(cube_lut, factor, bake, cache_dir or temp_dir, yuv_color=(standard, range))
+
+        temp_yuv = _get_temp_filename(dst_yuv)
+
+        # preallocate, and write y4m header, before workers write frames by index
+        yuv_writer.YuvWriter(temp_yuv, width=width, height=height, fps=fps or "25:1", frame_num=frame_num).close()
+
+        tasks = [(_apply_to_yuv_frames, (src_yuv, temp_yuv, first, stop))
+                 for first, stop in yuv.iter_blocks(frame_num, frames_per_task)]
+
+        try:
+            pixels = sum(_run_batch(tasks, lut_source, workers))
+        except BaseException:
+            os.remove(temp_yuv)
+            raise
+
+        os.replace(temp_yuv, dst_yuv)
+
+    stats = {"processed": frame_num, "skipped": 0, "pixels": pixels}
+
+    return _report_throughput("apply_to_yuv", stats, start, verbose)
+
+
+def apply_3d_lut_for_cv_image(cv_image, cube_lut, factor = 1.0):
+    """
+    apply_3d_lut_for_cv_image
+
+    Args:
+        cv_image (np.array): opencv bgr image
+        cube_lut (ImageFilter.Color3DLUT): 3d cube lut filter of pillow 
+        factor (float, optional): blend factor. Defaults to 1.0.
+
+    Returns:
+        res_image: opencv bgr image, uint8
+
+    Note: applied by apply_lut natively, bit exact to pillow filter, without bgr/rgb flips and pillow copies
+    """
+
+    res_image = apply_lut(cv_image, cube_lut)
+
+    if factor != 1.0:
+        blend_image = cv_image.astype(np.float32) * np.float32(1.0 - factor)
+        blend_image += res_image * np.float32(factor)
+
+        np.rint(blend_image, out=blend_image)
+        np.clip(blend_image, 0, 255, out=blend_image)
+
+        res_image[...] = blend_image
 
     return res_image
 
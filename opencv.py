@@ -9,9 +9,79 @@
 @version     : 1.0
 """
 
+import functools
+
 import cv2
 import numpy as np
 
+
+# bgr --> bgr, rows: b, g, r, columns: b, g, r
+_BT709_RECTIFY_MATRIX = np.array([[ 1.04124,  -0.027936, -0.013428],
+                                  [ 0.058408,  0.844783,  0.096685],
+                                  [-0.013231, -0.073168,  1.086275]])
+
+
+# pixels per block of lookup, bounds float64 temporaries
+_BLOCK_PIXELS = 1 << 16
+
+
+@functools.lru_cache(maxsize=None)
+def _get_bt709_rectify_lookup_tables():
+    """float64 tables[i, j, v] = matrix[i, 2 - j] * v, i.e., products of output channel i and input r, g, b,
+    the same products as the float path"""
+
+    tables = _BT709_RECTIFY_MATRIX[:, ::-1, None] * np.arange(256, dtype=np.float64)
+    tables.flags.writeable = False
+
+    return tables
+
+
+def _apply_bt709_rectify_lookup_tables(bgr_image):
+    """rectify uint8 image by gathers of float64 products, summed in the same order (r, g, b) as the float path,
+    so that the result is bit-exact with it, including truncation"""
+
+    tables = _get_bt709_rectify_lookup_tables()
+
+    bgr_image = np.ascontiguousarray(bgr_image)
+    out = np.empty_like(bgr_image)
+
+    src_pixels = bgr_image.reshape(-1, 3)
+    dst_pixels = out.reshape(-1, 3)
+
+    pixel_num = src_pixels.shape[0]
+    block_size = max(1, min(_BLOCK_PIXELS, pixel_num))
+
+    dst_buffer  = np.empty(block_size, dtype=np.float64)
+    term_buffer = np.empty(block_size, dtype=np.float64)
+
+    for start in range(0, pixel_num, block_size):
+        stop = min(start + block_size, pixel_num)
+
+        src_block = src_pixels[start:stop]
+        dst_block = dst_buffer[:stop - start]
+        term      = term_buffer[:stop - start]
+
+        for i in range(3):
+            np.take(tables[i, 0], src_block[:, 2], out=dst_block)
+            for j in (1, 2):
+                np.take(tables[i, j], src_block[:, 2 - j], out=term)
+                dst_block += term
+
+            np.clip(dst_block, 0, 255, out=dst_block)
+
+            # NOTE: float to uint8 assignment truncates, the same as astype
+            dst_pixels[start:stop, i] = dst_block
+
+    return out
+
+
+def get_bt709_rectify_matrix():
+    """get color matrix of rectify_bgr_img_read_by_opencv_for_bt709_video, rows and columns in b, g, r order,
+    e.g., to fold into a lut by lut.compose_luts(..., pre_matrix=matrix, matrix_order="bgr")"""
+
+    return _BT709_RECTIFY_MATRIX.copy()
+
+
 def rectify_bgr_img_read_by_opencv_for_bt709_video(bgr_image):
     """rectify_bgr_img_read_by_opencv_for_bt709_video
 
@@ -48,8 +118,13 @@ def rectify_bgr_img_read_by_opencv_for_bt709_video(bgr_image):
     https://github.com/opencv/opencv/issues/20513
     https://stackoverflow.com/questions/68629271/opencv-read-write-video-color-difference
 
+    uint8 image is converted by cached tables of float64 products, bit-exact with the float path, i.e., truncated
+
     """
 
+    if bgr_image.dtype == np.uint8:
+        return _apply_bt709_rectify_lookup_tables(bgr_image)
+
     res_bgr_image = np.zeros_like(bgr_image, dtype='float')
     
     #R
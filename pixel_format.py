@@ -0,0 +1,192 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+@file        : pixel_format.py
+@description : yuv pixel format descriptors
+@version     : 1.0
+"""
+
+import numpy as np
+
+class PixelFormat:
+    """pixel format descriptor, knows plane offsets, strides, subsampling and bit depth of a frame
+
+    Args:
+        name (str): pixel format name, e.g., "nv12"
+        layout (str): "planar", "semi_planar" or "packed"
+        subsampling (tuple): chroma subsampling (horizontal, vertical), e.g., (2, 2) for 420
+        bit_depth (int): valid bits of each sample
+        dtype : numpy dtype of each sample container
+        chroma_order (str, optional): "uv" or "vu". Defaults to "uv".
+        shift (int, optional): bits samples are shifted left in container, e.g., 6 for P010. Defaults to 0.
+        cv2_to_bgr (str, optional): name of cv2 color conversion code to bgr. Defaults to None.
+        cv2_from_bgr (str, optional): name of cv2 color conversion code from bgr. Defaults to None.
+
+    Note:
+        all offsets, shapes and strides are in samples, not bytes.
+        packed layout only supports YUYV (Y0 U Y1 V) order.
+    """
+
+    def __init__(self, name, layout, subsampling, bit_depth, dtype, chroma_order="uv", shift=0, cv2_to_bgr=None, cv2_from_bgr=None):
+        self.name = name
+        self.layout = layout
+        self.subsampling = subsampling
+        self.bit_depth = bit_depth
+        self.dtype = np.dtype(dtype)
+        self.chroma_order = chroma_order
+        self.shift = shift
+        self.cv2_to_bgr = cv2_to_bgr
+        self.cv2_from_bgr = cv2_from_bgr
+
+    def __repr__(self):
+        return f"PixelFormat({self.name})"
+
+    def get_chroma_size(self, width, height):
+        """get chroma plane size (width, height)"""
+
+        sub_x, sub_y = self.subsampling
+
+        if width % sub_x or height % sub_y:
+            raise ValueError(f"Error: size {width}x{height} not divisible by subsampling of {self.name}")
+
+        return width // sub_x, height // sub_y
+
+    def get_frame_shape(self, width, height):
+        """get frame shape (rows, columns) in samples, e.g., (height * 3 / 2, width) for I420"""
+
+        chroma_width, chroma_height = self.get_chroma_size(width, height)
+
+        if self.layout == "packed":
+            return (height, width * 2)
+
+        return (height + 2 * chroma_width * chroma_height // width, width)
+
+    def get_frame_size(self, width, height):
+        """get frame size in bytes"""
+
+        rows, cols = self.get_frame_shape(width, height)
+
+        return rows * cols * self.dtype.itemsize
+
+    def get_plane_layout(self, width, height):
+        """get plane layout
+
+        Returns:
+            dict: plane name ("y", "u", "v") --> (offset, shape, strides), all in samples
+        """
+
+        chroma_width, chroma_height = self.get_chroma_size(width, height)
+
+        luma_size = width * height
+
+        if self.layout == "packed":
+            return {
+                "y": (0, (height, width), (2 * width, 2)),
+                "u": (1, (height, chroma_width), (2 * width, 4)),
+                "v": (3, (height, chroma_width), (2 * width, 4)),
+            }
+
+        if self.layout == "semi_planar":
+            first  = (luma_size,     (chroma_height, chroma_width), (2 * chroma_width, 2))
+            second = (luma_size + 1, (chroma_height, chroma_width), (2 * chroma_width, 2))
+        else:
+            first  = (luma_size,                                 (chroma_height, chroma_width), (chroma_width, 1))
+            second = (luma_size + chroma_width * chroma_height, (chroma_height, chroma_width), (chroma_width, 1))
+
+        layout = {"y": (0, (height, width), (width, 1))}
+        layout[self.chroma_order[0]] = first
+        layout[self.chroma_order[1]] = second
+
+        return layout
+
+    def get_planes(self, frame, width, height):
+        """get zero-copy plane views of frame
+
+        Args:
+            frame (np.array): C-contiguous frame of get_frame_shape, or any buffer of get_frame_size bytes
+            width (int): image width
+            height (int): image height
+
+        Returns:
+            dict: plane name ("y", "u", "v") --> np.array view
+        """
+
+        if not isinstance(frame, np.ndarray):
+            frame = np.frombuffer(frame, dtype=self.dtype)
+
+        if frame.dtype != self.dtype or not frame.flags.c_contiguous or frame.size * frame.itemsize != self.get_frame_size(width, height):
+            raise ValueError(f"Error: frame of {frame.dtype} {frame.shape} does not match {self.name} {width}x{height}")
+
+        flat = frame.reshape(-1)
+
+        planes = {}
+        for name, (offset, shape, strides) in self.get_plane_layout(width, height).items():
+            planes[name] = np.lib.stride_tricks.as_strided(flat[offset:], shape=shape,
+                                                           strides=tuple(stride * flat.itemsize for stride in strides),
+                                                           writeable=flat.flags.writeable)
+
+        return planes
+
+
+PIXEL_FORMATS = {
+    "i420": PixelFormat("i420", "planar",      (2, 2), 8,  np.uint8,  cv2_to_bgr="COLOR_YUV2BGR_I420", cv2_from_bgr="COLOR_BGR2YUV_I420"),
+    "i422": PixelFormat("i422", "planar",      (2, 1), 8,  np.uint8),
+    "i444": PixelFormat("i444", "planar",      (1, 1), 8,  np.uint8),
+    "nv12": PixelFormat("nv12", "semi_planar", (2, 2), 8,  np.uint8,  cv2_to_bgr="COLOR_YUV2BGR_NV12"),
+    "nv21": PixelFormat("nv21", "semi_planar", (2, 2), 8,  np.uint8,  chroma_order="vu", cv2_to_bgr="COLOR_YUV2BGR_NV21"),
+    "yuyv": PixelFormat("yuyv", "packed",      (2, 1), 8,  np.uint8,  cv2_to_bgr="COLOR_YUV2BGR_YUYV", cv2_from_bgr="COLOR_BGR2YUV_YUYV"),
+    "p010": PixelFormat("p010", "semi_planar", (2, 2), 10, np.dtype("<u2"), shift=6),
+    "i420p10": PixelFormat("i420p10", "planar", (2, 2), 10, np.dtype("<u2")),
+}
+
+
+def get_pixel_format(pix_fmt):
+    """get pixel format descriptor
+
+    Args:
+        pix_fmt (str/PixelFormat): pixel format name, e.g., "nv12", or descriptor
+
+    Returns:
+        PixelFormat: pixel format descriptor
+    """
+
+    if isinstance(pix_fmt, PixelFormat):
+        return pix_fmt
+
+    if pix_fmt.lower() not in PIXEL_FORMATS:
+        raise ValueError(f"Error: unsupported pixel format: {pix_fmt}")
+
+    return PIXEL_FORMATS[pix_fmt.lower()]
+
+
+def convert_planes(src_planes, dst_planes, src_pix_fmt, dst_pix_fmt):
+    """copy planes between pixel formats of same subsampling, adjusting bit depth
+
+    Args:
+        src_planes (dict): source planes, see PixelFormat.get_planes
+        dst_planes (dict): destination planes, see PixelFormat.get_planes
+        src_pix_fmt (str/PixelFormat): source pixel format
+        dst_pix_fmt (str/PixelFormat): destination pixel format
+    """
+
+    src_pix_fmt = get_pixel_format(src_pix_fmt)
+    dst_pix_fmt = get_pixel_format(dst_pix_fmt)
+
+    if src_pix_fmt.subsampling != dst_pix_fmt.subsampling:
+        raise ValueError(f"Error: subsampling mismatch: {src_pix_fmt.name} --> {dst_pix_fmt.name}")
+
+    for name in ("y", "u", "v"):
+        plane = src_planes[name] >> src_pix_fmt.shift if src_pix_fmt.shift else src_planes[name]
+
+        depth_shift = dst_pix_fmt.bit_depth - src_pix_fmt.bit_depth
+
+        if depth_shift > 0:
+            plane = plane.astype(dst_pix_fmt.dtype) << depth_shift
+        elif depth_shift < 0:
+            plane = plane >> -depth_shift
+
+        if dst_pix_fmt.shift:
+            plane = plane.astype(dst_pix_fmt.dtype) << dst_pix_fmt.shift
+
+        dst_planes[name][...] = plane
@@ -0,0 +1,21 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+@file        : conftest.py
+@description : import the repository as package orion, e.g., when run from a checkout by: python -m pytest tests
+@version     : 1.0
+"""
+
+import os
+import sys
+import importlib.util
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+if "orion" not in sys.modules:
+    spec = importlib.util.spec_from_file_location("orion", os.path.join(ROOT, "__init__.py"),
+                                                  submodule_search_locations=[ROOT])
+    module = importlib.util.module_from_spec(spec)
+    sys.modules["orion"] = module
+    spec.loader.exec_module(module)
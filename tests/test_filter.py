@@ -0,0 +1,74 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+@file        : test_filter.py
+@description : homomorphic filter, spatial against fft method
+@version     : 1.0
+"""
+
+import numpy as np
+import cv2
+import pytest
+
+from orion import filter
+
+# cutoff frequencies from wide to sub-pixel gaussians, on both sides of the auto crossover
+CUTOFF_FREQS = [200, 50, 20, 10, 5]
+
+SHAPES = [(240, 320), (480, 640)]
+
+# max difference of spatial and fft method, LSB
+TOLERANCE = 1
+
+
+def _smooth_image(shape, seed):
+    noise = np.random.RandomState(seed).randint(0, 256, shape).astype(np.uint8)
+
+    return cv2.GaussianBlur(noise, (5, 5), 2)
+
+
+@pytest.mark.parametrize("shape", SHAPES)
+@pytest.mark.parametrize("cutoff_freq", CUTOFF_FREQS)
+def test_spatial_matches_fft(shape, cutoff_freq):
+    gray = _smooth_image(shape, 0)
+
+    fft_result = filter.homomorphic_filter(gray, cutoff_freq, method="fft")
+    spatial_result = filter.homomorphic_filter(gray, cutoff_freq, method="spatial")
+
+    assert np.abs(fft_result.astype(np.int32) - spatial_result).max() <= TOLERANCE
+
+
+@pytest.mark.parametrize("shape", SHAPES)
+def test_auto_is_fft_or_spatial(shape):
+    gray = _smooth_image(shape, 1)
+
+    methods = set()
+
+    for cutoff_freq in CUTOFF_FREQS:
+        auto_result = filter.homomorphic_filter(gray, cutoff_freq, method="auto")
+
+        results = {method: filter.homomorphic_filter(gray, cutoff_freq, method=method) for method in ("fft", "spatial")}
+        matched = [method for method, result in results.items() if np.array_equal(auto_result, result)]
+
+        assert matched
+        methods.update(matched)
+
+    # the cutoffs cover both sides of the crossover
+    assert methods == {"fft", "spatial"}
+
+
+def test_bgr_spatial_matches_fft():
+    bgr = _smooth_image((240, 320, 3), 2)
+
+    for use_yuv in (False, True):
+        fft_result = filter.homomorphic_filter(bgr, 20, use_yuv=use_yuv, method="fft")
+        spatial_result = filter.homomorphic_filter(bgr, 20, use_yuv=use_yuv, method="spatial")
+
+        # NOTE: 1 LSB of gray may move bgr by a few LSB through color conversion
+        assert np.abs(fft_result.astype(np.int32) - spatial_result).max() <= 3
+
+
+def test_unsupported_method():
+    with pytest.raises(ValueError):
+        filter.homomorphic_filter(_smooth_image((32, 32), 3), method="dct")
@@ -0,0 +1,84 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+@file        : test_lut.py
+@description : native lut engine against pillow Color3DLUT
+@version     : 1.0
+"""
+
+import numpy as np
+import pytest
+from PIL import Image, ImageFilter
+
+from orion import lut
+
+# (size1, size2, size3) of pillow, i.e., sizes of r, g, b
+SIZES = [(64, 64, 64), (33, 33, 33), (17, 9, 5), (2, 2, 2)]
+
+
+def _random_lut(size, seed):
+    random_state = np.random.RandomState(seed)
+
+    table = random_state.uniform(0.0, 1.0, size[0] * size[1] * size[2] * 3).astype(np.float32)
+
+    return ImageFilter.Color3DLUT(size, table)
+
+
+def _random_rgb(seed, shape=(97, 131, 3)):
+    # NOTE: odd shape, not a multiple of tile rows
+    return np.random.RandomState(seed).randint(0, 256, shape).astype(np.uint8)
+
+
+def _apply_pillow(rgb, cube_lut):
+    return np.asarray(Image.fromarray(rgb).filter(cube_lut))
+
+
+@pytest.mark.parametrize("size", SIZES)
+def test_apply_lut_uint8_is_bit_exact_to_pillow(size):
+    cube_lut = _random_lut(size, 0)
+    rgb = _random_rgb(1)
+
+    expected = _apply_pillow(rgb, cube_lut)
+
+    np.testing.assert_array_equal(lut.apply_lut(rgb, cube_lut, channel_order="rgb", workers=1), expected)
+
+    # bgr order and multiple workers share the same arithmetic
+    bgr = np.ascontiguousarray(rgb[..., ::-1])
+    result = lut.apply_lut(bgr, cube_lut, channel_order="bgr", workers=2, tile_rows=16)
+
+    np.testing.assert_array_equal(result[..., ::-1], expected)
+
+
+@pytest.mark.parametrize("size", SIZES)
+def test_apply_lut_float_matches_pillow(size):
+    cube_lut = _random_lut(size, 2)
+    rgb = _random_rgb(3)
+
+    expected = _apply_pillow(rgb, cube_lut).astype(np.float32)
+
+    result = lut.apply_lut(rgb.astype(np.float32) / 255.0, cube_lut, channel_order="rgb", workers=1)
+
+    assert result.dtype == np.float32
+
+    # pillow rounds the fixed point result to uint8
+    assert np.abs(result * 255.0 - expected).max() <= 1.0
+
+
+def test_apply_lut_out_buffer():
+    cube_lut = _random_lut((33, 33, 33), 4)
+    rgb = _random_rgb(5)
+
+    out = np.empty_like(rgb)
+
+    assert lut.apply_lut(rgb, cube_lut, channel_order="rgb", out=out) is out
+    np.testing.assert_array_equal(out, _apply_pillow(rgb, cube_lut))
+
+
+@pytest.mark.parametrize("size", [2, 17, 33, 64])
+def test_identity_lattice_spans_full_range(size):
+    rgb = _random_rgb(6)
+
+    result = lut.apply_lut(rgb, lut.generate_identity_lattice(size), channel_order="rgb")
+
+    assert np.abs(result.astype(np.int32) - rgb).max() <= 1
@@ -0,0 +1,135 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+@file        : test_tile.py
+@description : tiled overlap-add processing
+@version     : 1.0
+"""
+
+import numpy as np
+import cv2
+import pytest
+
+from orion import tile, histogram, filter
+
+
+def _smooth_image(shape, seed):
+    noise = np.random.RandomState(seed).randint(0, 256, shape).astype(np.uint8)
+
+    return cv2.GaussianBlur(noise, (9, 9), 3)
+
+
+def _gradient_image(shape):
+    """horizontal gradient with texture, global operators differ most from per tile ones on it"""
+    gradient = np.linspace(0, 200, shape[1], dtype=np.float32)[None, :]
+    texture = _smooth_image(shape[:2], 7).astype(np.float32) / 4
+
+    gray = np.clip(gradient + texture, 0, 255).astype(np.uint8)
+
+    return gray if len(shape) == 2 else np.ascontiguousarray(np.stack([gray, gray // 2 + 60, 255 - gray], axis=-1))
+
+
+def _get_seams(length, tile_length, overlap):
+    """tile edges inside image"""
+    starts = tile.get_tile_starts(length, tile_length, overlap)
+
+    return sorted(set(starts[1:]) | set(start + tile_length for start in starts[:-1]))
+
+
+@pytest.mark.parametrize("tile_size", [(64, 80), (100, 100), (300, 400)])
+@pytest.mark.parametrize("workers", [1, 2])
+def test_identity_is_exact(tile_size, workers):
+    image = _smooth_image((300, 400, 3), 0)
+
+    result = tile.process_tiles(image, lambda src_tile: src_tile, tile_size=tile_size, overlap=16, workers=workers)
+
+    np.testing.assert_array_equal(result, image)
+
+
+def test_memmap_matches_in_memory(tmp_path):
+    image = _smooth_image((300, 400), 1)
+
+    np.save(tmp_path / "src.npy", image)
+    src = np.load(tmp_path / "src.npy", mmap_mode="r")
+    out = np.lib.format.open_memmap(tmp_path / "dst.npy", mode="w+", shape=src.shape, dtype=np.uint8)
+
+    histogram.he_tiled(src, out=out, memory_budget=1 << 20)
+    out.flush()
+
+    expected = histogram.he_tiled(image, memory_budget=1 << 20)
+
+    np.testing.assert_array_equal(np.load(tmp_path / "dst.npy"), expected)
+
+
+@pytest.mark.parametrize("shape", [(600, 800), (600, 800, 3)])
+@pytest.mark.parametrize("use_yuv", [True, False])
+def test_he_tiled_equals_he(shape, use_yuv):
+    image = _gradient_image(shape)
+
+    memory_budget = 1 << 20
+    assert tile.get_band_rows(shape, memory_budget) < shape[0]
+
+    np.testing.assert_array_equal(histogram.he_tiled(image, use_yuv, memory_budget=memory_budget),
+                                  histogram.he(image, use_yuv))
+
+
+@pytest.mark.parametrize("shape", [(600, 800), (600, 800, 3)])
+@pytest.mark.parametrize("cutoff_freq", [200, 20])
+def test_homomorphic_filter_tiled_matches_untiled(shape, cutoff_freq):
+    image = _gradient_image(shape)
+
+    result = filter.homomorphic_filter_tiled(image, cutoff_freq, memory_budget=4 << 20).astype(np.int32)
+
+    # banded filter is the spatial method, which differs from fft by at most 1 LSB of gray
+    assert np.abs(result - filter.homomorphic_filter(image, cutoff_freq, method="spatial")).max() <= 1
+
+    # 1 LSB of gray may move bgr by a few LSB through color conversion
+    assert np.abs(result - filter.homomorphic_filter(image, cutoff_freq)).max() <= (1 if len(shape) == 2 else 3)
+
+
+def test_homomorphic_filter_tiled_is_banded():
+    shape = (600, 800)
+
+    taps = len(filter._get_gaussian_taps(shape[0], 200, 0.1))
+
+    assert tile.get_band_rows(shape, 4 << 20, 20, taps // 2, taps // 2) < shape[0]
+
+
+@pytest.mark.parametrize("use_yuv", [True, False])
+def test_clahe_tiled_bgr(use_yuv):
+    image = _smooth_image((600, 800, 3), 2)
+
+    memory_budget = 6 << 20
+    tile_rows, tile_cols = tile.get_tile_size(image.shape, memory_budget, 64, 1, 16)
+
+    result = histogram.clahe_tiled(image, use_yuv=use_yuv, memory_budget=memory_budget, workers=1).astype(np.int32)
+    expected = histogram.clahe(image, use_yuv=use_yuv).astype(np.int32)
+
+    # equalized channel is merged back into bgr
+    assert np.abs(result - image).max() > 8
+
+    diff = np.abs(result - expected)
+    assert diff.mean() < 1
+
+    row_seams = _get_seams(image.shape[0], tile_rows, 64)
+    col_seams = _get_seams(image.shape[1], tile_cols, 64)
+
+    assert row_seams and col_seams
+
+    # no step at seams beyond that of clahe, i.e., blending of overlapping tiles is continuous
+    row_steps = np.abs(np.diff(result, axis=0)) - np.abs(np.diff(expected, axis=0))
+    col_steps = np.abs(np.diff(result, axis=1)) - np.abs(np.diff(expected, axis=1))
+
+    for seam in row_seams:
+        assert diff[seam - 2: seam + 2].max() <= 8
+        assert row_steps[seam - 2: seam + 2].max() <= 3
+
+    for seam in col_seams:
+        assert diff[:, seam - 2: seam + 2].max() <= 8
+        assert col_steps[:, seam - 2: seam + 2].max() <= 3
+
+
+def test_memory_budget_too_small():
+    with pytest.raises(ValueError):
+        tile.get_tile_size((20000, 20000, 3), memory_budget=1 << 20, overlap=64)
@@ -0,0 +1,252 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+@file        : tile.py
+@description : tiled overlap-add and banded processing of large images
+@version     : 1.0
+"""
+
+import os
+import concurrent.futures
+
+import numpy as np
+
+# memory budget of tiled processing, bytes
+DEFAULT_MEMORY_BUDGET = 1 << 30
+
+def _get_tile_memory(tile_rows, tile_cols, width, channels, workers, working_bytes_per_pixel):
+    """resident bytes: float32 accumulator and weights of a band of tile rows, and working set of each worker"""
+
+    band = tile_rows * width * (channels + 1) * 4
+    working = workers * tile_rows * tile_cols * (working_bytes_per_pixel + channels * 4)
+
+    return band + working
+
+def get_tile_size(shape, memory_budget=DEFAULT_MEMORY_BUDGET, overlap=64, workers=1, working_bytes_per_pixel=64, aspect=None):
+    """get largest tile size (rows, cols) of which tiled processing fits memory budget
+
+    Args:
+        shape (tuple): image shape, (height, width) or (height, width, channels)
+        memory_budget (int, optional): bytes. Defaults to DEFAULT_MEMORY_BUDGET.
+        overlap (int, optional): overlap of neighboring tiles. Defaults to 64.
+        workers (int, optional): tiles processed at the same time. Defaults to 1.
+        working_bytes_per_pixel (int, optional): memory used by function per tile pixel. Defaults to 64.
+        aspect (float, optional): tile rows / cols, e.g., height / width to scale image uniformly.
+                                  Defaults to None, i.e., square tile.
+
+    Returns:
+        tuple: (tile_rows, tile_cols)
+    """
+
+    height, width = shape[:2]
+    channels = shape[2] if len(shape) > 2 else 1
+
+    aspect = 1.0 if aspect is None else aspect
+
+    def get_size(tile_cols):
+        return min(height, max(1, int(tile_cols * aspect))), min(width, tile_cols)
+
+    def fits(tile_cols):
+        tile_rows, tile_cols = get_size(tile_cols)
+        return _get_tile_memory(tile_rows, tile_cols, width, channels, workers, working_bytes_per_pixel) <= memory_budget
+
+    # bisection of largest fitting tile columns, memory grows with tile size
+    low, high = 0, max(width, int(np.ceil(height / aspect)))
+    while low < high:
+        middle = (low + high + 1) // 2
+        if fits(middle):
+            low = middle
+        else:
+            high = middle - 1
+
+    tile_rows, tile_cols = get_size(max(low, 1))
+
+    if low == 0 or (tile_rows < min(height, 2 * overlap + 1)) or (tile_cols < min(width, 2 * overlap + 1)):
+        raise ValueError(f"Error: memory budget {memory_budget} too small for image {shape} with overlap {overlap}")
+
+    return tile_rows, tile_cols
+
+def get_band_rows(shape, memory_budget=DEFAULT_MEMORY_BUDGET, bytes_per_pixel=16, halo_rows=0, halo_cols=0):
+    """get largest rows of full width bands of which banded processing fits memory budget
+
+    Banded processing suits operators which are exact by rows, e.g., pixel-wise lookup after a global statistic pass,
+    or separable filters of which each band is read with halo_rows rows above and below.
+
+    Args:
+        shape (tuple): image shape, (height, width) or (height, width, channels)
+        memory_budget (int, optional): bytes. Defaults to DEFAULT_MEMORY_BUDGET.
+        bytes_per_pixel (int, optional): memory used per pixel of band, including halo. Defaults to 16.
+        halo_rows (int, optional): rows read above and below each band. Defaults to 0.
+        halo_cols (int, optional): columns padded left and right of each band. Defaults to 0.
+
+    Returns:
+        int: band rows
+    """
+
+    height, width = shape[:2]
+
+    band_rows = memory_budget // ((width + 2 * halo_cols) * bytes_per_pixel) - 2 * halo_rows
+
+    if band_rows < 1:
+        raise ValueError(f"Error: memory budget {memory_budget} too small for image {shape} with halo {halo_rows}")
+
+    return min(band_rows, height)
+
+def get_tile_starts(length, tile_length, overlap):
+    """get tile starts along an axis, the last tile is aligned to the end
+
+    Args:
+        length (int): image length
+        tile_length (int): tile length
+        overlap (int): minimum overlap of neighboring tiles
+
+    Returns:
+        list: starts
+    """
+
+    if tile_length >= length:
+        return [0]
+
+    step = tile_length - overlap
+    if step <= 0:
+        raise ValueError(f"Error: overlap {overlap} should be less than tile length {tile_length}")
+
+    starts = list(range(0, length - tile_length, step))
+    starts.append(length - tile_length)
+
+    return starts
+
+def _get_window(start, tile_length, length, overlap):
+    """1d blending window, raised cosine ramps of overlap on sides with a neighbor, complementary to the neighbor's"""
+
+    window = np.ones(tile_length, dtype=np.float32)
+
+    if overlap <= 0:
+        return window
+
+    ramp = np.sin(0.5 * np.pi * (np.arange(overlap, dtype=np.float32) + 0.5) / overlap) ** 2
+
+    if start > 0:
+        window[:overlap] = ramp
+    if start + tile_length < length:
+        window[tile_length - overlap:] = ramp[::-1]
+
+    return window
+
+def process_tiles(src, function, out=None, tile_size=None, overlap=64, memory_budget=DEFAULT_MEMORY_BUDGET,
+                  workers=None, working_bytes_per_pixel=64):
+    """process image by overlapping tiles, blended by windowed overlap-add
+
+    Tiles are processed band by band of tile rows, only the float accumulator of the current band is resident,
+    finished rows are written to out, so that src and out can be np.memmap of images larger than memory.
+
+    e.g., process a 20k x 20k scan saved as .npy:
+
+        src = np.load("scan.npy", mmap_mode="r")
+        out = np.lib.format.open_memmap("result.npy", mode="w+", shape=src.shape, dtype=np.uint8)
+        tile.process_tiles(src, lambda t: histogram.clahe(t), out=out)
+
+    Args:
+        src (np.array): image of size height * width or height * width * channels, e.g., np.memmap
+        function (callable): function(tile) --> processed tile of same shape
+        out (np.array, optional): output of same shape, e.g., np.memmap, integer output is rounded and clipped.
+                                  Defaults to None, i.e., array of dtype of src.
+        tile_size (tuple, optional): (rows, cols). Defaults to None, i.e., get_tile_size of memory budget.
+        overlap (int, optional): overlap of neighboring tiles, blended over. Defaults to 64.
+        memory_budget (int, optional): bytes, to choose tile size. Defaults to DEFAULT_MEMORY_BUDGET.
+        workers (int, optional): threads processing tiles of a band, None for cpu count. Defaults to None.
+        working_bytes_per_pixel (int, optional): memory used by function per tile pixel. Defaults to 64.
+
+    Returns:
+        np.array: output, the same object as out if given
+    """
+
+    height, width = src.shape[:2]
+
+    workers = os.cpu_count() if workers is None else workers
+
+    if out is None:
+        out = np.empty(src.shape, dtype=src.dtype)
+    elif out.shape != src.shape:
+        raise ValueError(f"Error: out should be of shape {src.shape}")
+
+    if tile_size is None:
+        tile_size = get_tile_size(src.shape, memory_budget, overlap, workers, working_bytes_per_pixel)
+
+    tile_rows, tile_cols = min(tile_size[0], height), min(tile_size[1], width)
+
+    row_starts = get_tile_starts(height, tile_rows, overlap)
+    col_starts = get_tile_starts(width, tile_cols, overlap)
+
+    col_windows = [_get_window(start, tile_cols, width, overlap) for start in col_starts]
+
+    channel_shape = src.shape[2:]
+
+    if np.issubdtype(out.dtype, np.integer):
+        info = np.iinfo(out.dtype)
+        low, high = info.min, info.max
+    else:
+        low = high = None
+
+    # accumulator of rows [band_start, band_start + tile_rows)
+    accumulator = np.zeros((tile_rows, width) + channel_shape, dtype=np.float32)
+    weights = np.zeros((tile_rows, width), dtype=np.float32)
+
+    def process(row_start, col_start):
+        tile = np.ascontiguousarray(src[row_start: row_start + tile_rows, col_start: col_start + tile_cols])
+        result = function(tile)
+
+        if result.shape != tile.shape:
+            raise ValueError(f"Error: function should keep tile shape {tile.shape}: {result.shape}")
+
+        return result
+
+    def flush(rows):
+        """write first rows of accumulator to out, and shift the rest up"""
+
+        band_weights = weights[:rows].reshape(weights[:rows].shape + (1,) * len(channel_shape))
+        result = accumulator[:rows] / band_weights
+
+        if low is not None:
+            np.rint(result, out=result)
+            np.clip(result, low, high, out=result)
+
+        out[band_start: band_start + rows] = result
+
+        accumulator[:tile_rows - rows] = accumulator[rows:]
+        accumulator[tile_rows - rows:] = 0
+        weights[:tile_rows - rows] = weights[rows:]
+        weights[tile_rows - rows:] = 0
+
+    executor = concurrent.futures.ThreadPoolExecutor(max_workers=workers) if workers > 1 else None
+
+    try:
+        for i, band_start in enumerate(row_starts):
+            row_window = _get_window(band_start, tile_rows, height, overlap)
+
+            # NOTE: at most workers tiles in flight, results accumulated in order by caller thread
+            for group in range(0, len(col_starts), max(workers, 1)):
+                starts = col_starts[group: group + max(workers, 1)]
+
+                if executor is None:
+                    results = [process(band_start, col_start) for col_start in starts]
+                else:
+                    results = list(executor.map(process, [band_start] * len(starts), starts))
+
+                for j, (col_start, result) in enumerate(zip(starts, results)):
+                    window = row_window[:, None] * col_windows[group + j][None, :]
+
+                    region = (slice(0, tile_rows), slice(col_start, col_start + tile_cols))
+
+                    accumulator[region] += result * window.reshape(window.shape + (1,) * len(channel_shape))
+                    weights[region] += window
+
+            # rows before next band are final
+            next_start = row_starts[i + 1] if i + 1 < len(row_starts) else height
+            flush(next_start - band_start)
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    return out
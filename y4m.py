@@ -0,0 +1,198 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+@file        : y4m.py
+@description : y4m (YUV4MPEG2) container utils
+@version     : 1.0
+"""
+
+import os
+
+import numpy as np
+
+from . import pixel_format
+
+Y4M_SIGNATURE = b"YUV4MPEG2"
+
+FRAME_SIGNATURE = b"FRAME"
+
+# y4m colorspace --> pixel format
+Y4M_COLORSPACES = {
+    "420jpeg" : "i420",
+    "420paldv": "i420",
+    "420mpeg2": "i420",
+    "420"     : "i420",
+    "422"     : "i422",
+    "444"     : "i444",
+    "420p10"  : "i420p10",
+}
+
+# pixel format --> y4m colorspace
+PIXEL_FORMAT_COLORSPACES = {
+    "i420"   : "420jpeg",
+    "i422"   : "422",
+    "i444"   : "444",
+    "i420p10": "420p10",
+}
+
+# sidecar index: [file size, file mtime in ns, frame data offsets...]
+INDEX_SUFFIX = ".idx.npy"
+
+def is_y4m_file(filename):
+    """is_y4m_file
+
+    Args:
+        filename (str): file name
+
+    Returns:
+        bool: True if file name ends with .y4m
+    """
+    return filename.lower().endswith(".y4m")
+
+def parse_header(line):
+    """parse y4m stream header
+
+    Args:
+        line (bytes): stream header line, e.g., b"YUV4MPEG2 W1920 H1080 F30000:1001 Ip A1:1 C420jpeg\n"
+
+    Returns:
+        dict: width (int), height (int), fps (str, e.g., "30000:1001"), colorspace (str), pix_fmt (str),
+              and other raw parameters by their tag letter
+    """
+
+    tokens = line.rstrip(b"\n").split(b" ")
+
+    if tokens[0] != Y4M_SIGNATURE:
+        raise ValueError(f"Error: invalid y4m header: {line[:64]}")
+
+    header = {"fps": "25:1", "colorspace": "420jpeg"}
+
+    for token in tokens[1:]:
+        if not token:
+            continue
+
+        tag, value = chr(token[0]), token[1:].decode("ascii")
+
+        if tag == "W":
+            header["width"] = int(value)
+        elif tag == "H":
+            header["height"] = int(value)
+        elif tag == "F":
+            header["fps"] = value
+        elif tag == "C":
+            header["colorspace"] = value
+        else:
+            header[tag] = value
+
+    if "width" not in header or "height" not in header:
+        raise ValueError(f"Error: y4m header without size: {line[:64]}")
+
+    if header["colorspace"] not in Y4M_COLORSPACES:
+        raise ValueError(f"Error: unsupported y4m colorspace: {header['colorspace']}")
+
+    header["pix_fmt"] = Y4M_COLORSPACES[header["colorspace"]]
+
+    return header
+
+def format_header(width, height, pix_fmt="i420", fps="25:1"):
+    """format y4m stream header
+
+    Args:
+        width (int): image width
+        height (int): image height
+        pix_fmt (str, optional): pixel format. Defaults to "i420".
+        fps (str, optional): frame rate as "num:den". Defaults to "25:1".
+
+    Returns:
+        bytes: stream header line
+    """
+
+    name = pixel_format.get_pixel_format(pix_fmt).name
+
+    if name not in PIXEL_FORMAT_COLORSPACES:
+        raise ValueError(f"Error: unsupported pixel format for y4m: {name}")
+
+    return f"YUV4MPEG2 W{width} H{height} F{fps} Ip A1:1 C{PIXEL_FORMAT_COLORSPACES[name]}\n".encode("ascii")
+
+def read_header(file):
+    """read_header
+
+    Args:
+        file: binary file object positioned at start
+
+    Returns:
+        tuple: (header dict, see parse_header, header length in bytes)
+    """
+
+    line = file.readline()
+
+    return parse_header(line), len(line)
+
+def scan_frame_offsets(file, header_size, frame_size, file_size):
+    """scan FRAME headers, only frame headers are read, frame data are skipped by seek
+
+    Args:
+        file: binary file object
+        header_size (int): stream header length in bytes
+        frame_size (int): frame data size in bytes
+        file_size (int): file size in bytes
+
+    Returns:
+        np.array: int64 offsets of frame data
+    """
+
+    offsets = []
+
+    position = header_size
+    while position < file_size:
+        file.seek(position)
+        line = file.readline()
+
+        if not line.startswith(FRAME_SIGNATURE) or not line.endswith(b"\n"):
+            raise ValueError(f"Error: invalid y4m frame header at {position}: {line[:64]}")
+
+        data_offset = position + len(line)
+        if data_offset + frame_size > file_size:
+            break
+
+        offsets.append(data_offset)
+        position = data_offset + frame_size
+
+    return np.array(offsets, dtype=np.int64)
+
+def get_index_filename(filename):
+    return filename + INDEX_SUFFIX
+
+def load_frame_offsets(filename, header_size, frame_size):
+    """load frame offsets from sidecar index, or scan and save them when index missing or stale
+
+    Args:
+        filename (str): y4m file name
+        header_size (int): stream header length in bytes
+        frame_size (int): frame data size in bytes
+
+    Returns:
+        np.array: int64 offsets of frame data
+    """
+
+    stat = os.stat(filename)
+    index_filename = get_index_filename(filename)
+
+    try:
+        index = np.load(index_filename)
+        if len(index) >= 2 and index[0] == stat.st_size and index[1] == stat.st_mtime_ns:
+            return index[2:]
+    except (OSError, ValueError):
+        pass
+
+    with open(filename, "rb") as file:
+        offsets = scan_frame_offsets(file, header_size, frame_size, stat.st_size)
+
+    try:
+        np.save(index_filename, np.concatenate(([stat.st_size, stat.st_mtime_ns], offsets)).astype(np.int64))
+    except OSError:
+        # NOTE: read only directory, index is rebuilt next time
+        pass
+
+    return offsets
@@ -9,469 +9,888 @@
 @version     : 1.0
 """
 
+import functools
+
 import numpy as np
 
-def convert_yuv_420_to_444(yuv_420_image):
+def _upsample_chroma_axis(plane, axis, siting):
+    """2x upsample chroma plane along axis by linear interpolation, edges are clamped
+
+    siting: "center", chroma between two luma samples, or "left", chroma co-sited with even luma samples
+    """
+
+    plane = np.moveaxis(plane.astype(np.float32), axis, 0)
+
+    next_plane = np.concatenate((plane[1:], plane[-1:]))
+
+    result = np.empty((plane.shape[0] * 2,) + plane.shape[1:], dtype=np.float32)
+
+    if siting == "center":
+        prev_plane = np.concatenate((plane[:1], plane[:-1]))
+        result[0::2] = 0.75 * plane + 0.25 * prev_plane
+        result[1::2] = 0.75 * plane + 0.25 * next_plane
+    else:
+        result[0::2] = plane
+        result[1::2] = 0.5 * (plane + next_plane)
+
+    return np.moveaxis(result, 0, axis)
+
+
+def convert_yuv_420_to_444(yuv_420_image, mode="nearest", out=None):
     """convert yuv 420 to 444
 
     Args:
-        yuv_image (np.array): yuv 420 image of size (height * 3 / 2) * width
+        yuv_420_image (np.array): yuv 420 image of size (height * 3 / 2) * width
+        mode (str, optional): chroma upsampling mode. Defaults to "nearest".
+            "nearest" : repeat each chroma sample to its 2x2 luma block
+            "bilinear": linear interpolation, chroma centered in its 2x2 luma block (MPEG-1/JPEG)
+            "mpeg2"   : linear interpolation, chroma left-sited (co-sited with even luma column, MPEG-2/H.264 default)
+            "view"    : no copy, return read-only views (y, u, v), y of size height * width,
+                        u and v broadcast to size (height / 2) * 2 * (width / 2) * 2,
+                        i.e., u[i // 2, i % 2, j // 2, j % 2] is the chroma of pixel (i, j)
+        out (np.array, optional): output buffer of size height * width * 3, not used by "view". Defaults to None.
 
     Returns:
-        [type]: yuv 444 image of size height * width * 3
+        [type]: yuv 444 image of size height * width * 3, or tuple of views for "view" mode
     """
 
-    image_height = int(yuv_420_image.shape[0] * 2 / 3)
-    image_width  = yuv_420_image.shape[1]
+    y_420_plane, u_420_plane, v_420_plane = split_i420_planes(yuv_420_image)
+
+    image_height, image_width = y_420_plane.shape
+
+    uv_height = image_height // 2
+    uv_width  = image_width // 2
+
+    if mode == "view":
+        planes = [y_420_plane.view()]
+        for plane in (u_420_plane, v_420_plane):
+            planes.append(np.broadcast_to(plane[:, None, :, None], (uv_height, 2, uv_width, 2)))
+
+        for plane in planes:
+            plane.flags.writeable = False
+
+        return tuple(planes)
 
-    yuv_444_image = np.zeros((image_height, image_width, 3), dtype = yuv_420_image.dtype)
+    if mode not in ("nearest", "bilinear", "mpeg2"):
+        raise ValueError(f"Error: unsupported mode: {mode}")
+
+    if out is None:
+        out = np.empty((image_height, image_width, 3), dtype = yuv_420_image.dtype)
+    elif out.shape != (image_height, image_width, 3):
+        raise ValueError(f"Error: out should be of shape {(image_height, image_width, 3)}")
 
     #---------
 
-    yuv_444_image[:, :, 0] = yuv_420_image[0:image_height]
+    out[:, :, 0] = y_420_plane
 
     #---------
 
-    u_end_height = v_start_height = int(image_height * 5 / 4)
+    integer_output = np.issubdtype(out.dtype, np.integer)
+
+    for channel, plane in ((1, u_420_plane), (2, v_420_plane)):
+
+        if mode == "nearest":
+            # assign by broadcast, each chroma sample fills its 2x2 luma block
+            out[:, :, channel].reshape(uv_height, 2, uv_width, 2)[...] = plane[:, None, :, None]
+            continue
+
+        horizontal_siting = "center" if mode == "bilinear" else "left"
+
+        upsampled = _upsample_chroma_axis(_upsample_chroma_axis(plane, 0, "center"), 1, horizontal_siting)
+
+        out[:, :, channel] = np.rint(upsampled, out=upsampled) if integer_output else upsampled
+
+    return out
+
 
-    uv_height = int(image_height / 2)
-    uv_width  = int(image_width / 2)
+def _downsample_chroma_plane(plane, dst_plane, chroma_filter):
+    """2x2 downsample chroma plane into dst_plane, integer plane is accumulated in double width integer"""
 
-    u_420_image = yuv_420_image[image_height : u_end_height].reshape(uv_height, uv_width)
-    yuv_444_image[:, :, 1] = np.repeat(np.repeat(u_420_image, repeats=2, axis=0), repeats=2, axis=1)
+    if chroma_filter == "cosited":
+        dst_plane[...] = plane[0::2, 0::2]
+        return
 
-    v_420_image = yuv_420_image[v_start_height: ].reshape(uv_height, uv_width)
-    yuv_444_image[:, :, 2] = np.repeat(np.repeat(v_420_image, repeats=2, axis=0), repeats=2, axis=1)
+    if plane.dtype == np.uint8:
+        acc_dtype = np.uint16
+    elif plane.dtype == np.uint16:
+        acc_dtype = np.uint32
+    elif plane.dtype == np.float64:
+        acc_dtype = np.float64
+    else:
+        acc_dtype = np.float32
 
-    return yuv_444_image
+    rows = plane[0::2].astype(acc_dtype)
+    rows += plane[1::2]
 
+    if chroma_filter == "box":
+        acc = rows[:, 0::2]
+        acc += rows[:, 1::2]
+        shift = 2
+    else:
+        # [1 2 1] horizontal, co-sited with even columns, edge clamped
+        acc = rows[:, 0::2] * 2
+        acc += rows[:, 1::2]
+        acc[:, 1:] += rows[:, 1:-1:2]
+        acc[:, 0] += rows[:, 0]
+        shift = 3
 
-def convert_yuv_444_to_420(yuv_444_image):
+    if np.issubdtype(acc_dtype, np.integer):
+        acc += 1 << (shift - 1)
+        acc >>= shift
+    else:
+        acc *= 1.0 / (1 << shift)
+
+    dst_plane[...] = acc
+
+
+def convert_yuv_444_to_420(yuv_444_image, chroma_filter="box", out=None):
     """convert yuv 444 to 420
 
     Args:
-        yuv_image (np.array): yuv 444 image of height * width * 3
+        yuv_444_image (np.array): yuv 444 image of height * width * 3
+        chroma_filter (str, optional): chroma downsampling filter. Defaults to "box".
+            "box"    : average of 2x2 block, chroma centered
+            "cosited": decimation, take top-left sample of 2x2 block
+            "121"    : [1 2 1] horizontal (chroma co-sited with even column, MPEG-2) with average of two rows
+        out (np.array, optional): C-contiguous output buffer of size (height * 3 / 2) * width. Defaults to None.
 
     Returns:
         [type]: yuv 420 image of size size (height * 3 / 2) * width
     """
 
+    if chroma_filter not in ("box", "cosited", "121"):
+        raise ValueError(f"Error: unsupported chroma filter: {chroma_filter}")
+
     image_height = yuv_444_image.shape[0]
     image_width  = yuv_444_image.shape[1]
 
-    yuv_height = int(image_height * 3 / 2)
+    yuv_height = image_height * 3 // 2
 
-    yuv_420_image = np.zeros((yuv_height, image_width), dtype = yuv_444_image.dtype)
+    if out is None:
+        out = np.empty((yuv_height, image_width), dtype = yuv_444_image.dtype)
+    elif out.shape != (yuv_height, image_width) or not out.flags.c_contiguous:
+        raise ValueError(f"Error: out should be C-contiguous of shape {(yuv_height, image_width)}")
+
+    y_420_plane, u_420_plane, v_420_plane = split_i420_planes(out)
 
     #---------
 
-    yuv_420_image[0:image_height] = yuv_444_image[:,:,0]
+    y_420_plane[...] = yuv_444_image[:, :, 0]
 
     #---------
 
-    u_end_height = v_start_height = int(image_height * 5 / 4)
+    # NOTE: only chroma is accumulated, in uint16 for uint8 image to avoid overflow
+    _downsample_chroma_plane(yuv_444_image[:, :, 1], u_420_plane, chroma_filter)
+    _downsample_chroma_plane(yuv_444_image[:, :, 2], v_420_plane, chroma_filter)
 
-    uv_plane_height = int(image_height / 4)
+    return out
 
-    yuv_444_image = yuv_444_image.astype(np.float32) # to avoid overflow
 
-    u_420_image = (yuv_444_image[0::2, 0::2, 1] + yuv_444_image[0::2, 1::2, 1] + yuv_444_image[1::2, 0::2, 1] + yuv_444_image[1::2, 1::2, 1]) / 4.0 + 0.5
-    yuv_420_image[image_height: u_end_height] = u_420_image.reshape((uv_plane_height, -1))
+#---------------------------------------------------------------------------
+# color matrix
+#---------------------------------------------------------------------------
 
-    v_420_image = (yuv_444_image[0::2, 0::2, 2] + yuv_444_image[0::2, 1::2, 2] + yuv_444_image[1::2, 0::2, 2] + yuv_444_image[1::2, 1::2, 2]) / 4.0 + 0.5
-    yuv_420_image[v_start_height: ] = v_420_image.reshape((uv_plane_height, -1))
+# bgr --> yuv, rows: y, u, v, columns: b, g, r
+_BGR_TO_YUV_MATRIX = {
+    ("bt709", "limited"): [[ 0.062,  0.614,  0.183],
+                           [ 0.439, -0.339, -0.101],
+                           [-0.040, -0.399,  0.439]],
 
-    # print(yuv_420_image.dtype)
+    ("bt709", "full")   : [[ 0.072,  0.715,  0.213],
+                           [ 0.500, -0.385, -0.115],
+                           [-0.046, -0.454,  0.500]],
 
-    return yuv_420_image
+    ("bt601", "limited"): [[ 0.098,  0.504,  0.257],
+                           [ 0.439, -0.291, -0.148],
+                           [-0.071, -0.368,  0.439]],
 
+    ("bt601", "full")   : [[ 0.114,  0.587,  0.299],
+                           [ 0.500, -0.331, -0.169],
+                           [-0.081, -0.419,  0.500]],
+}
 
-def convert_bgr_to_709_limited_yuv(bgr_image):
-    """convert_bgr_to_709_limited_yuv
+# yuv --> bgr, rows: b, g, r, columns: y, u, v
+_YUV_TO_BGR_MATRIX = {
+    ("bt709", "limited"): [[ 1.164,  2.112,  0.000],
+                           [ 1.164, -0.213, -0.533],
+                           [ 1.164,  0.000,  1.793]],
+
+    ("bt709", "full")   : [[ 1.000,  1.856,  0.000],
+                           [ 1.000, -0.187, -0.468],
+                           [ 1.000,  0.000,  1.575]],
+
+    ("bt601", "limited"): [[ 1.164,  2.017,  0.000],
+                           [ 1.164, -0.392, -0.813],
+                           [ 1.164,  0.000,  1.596]],
+
+    ("bt601", "full")   : [[ 1.000,  1.772,  0.000],
+                           [ 1.000, -0.344, -0.714],
+                           [ 1.000,  0.000,  1.402]],
+}
+
+_YUV_OFFSET = {
+    "limited": (16.0, 128.0, 128.0),
+    "full"   : ( 0.0, 128.0, 128.0),
+}
+
+# (low, high) of y, u, v
+_YUV_CLIP_RANGE = {
+    "limited": ((16.0, 16.0, 16.0), (235.0, 240.0, 240.0)),
+    "full"   : (( 0.0,  0.0,  0.0), (255.0, 255.0, 255.0)),
+}
+
+_BGR_CLIP_RANGE = ((0.0, 0.0, 0.0), (255.0, 255.0, 255.0))
+
+# pixels processed per block, keeps the float intermediates cache resident
+_BLOCK_PIXELS = 1 << 16
+
+# Q13 coefficients, |coefficient| < 4 fits in int16, products of uint8 accumulate in int32
+_FIXED_POINT_SHIFT = 13
+
+
+@functools.lru_cache(maxsize=None)
+def get_affine_transform(src="bgr", dst="yuv", standard="bt709", range="limited"):
+    """get affine transform of color conversion, dst = matrix @ src + bias, clipped to [low, high]
 
     Args:
-        bgr_image (np.array): bgr image
+        src (str): source color space, "bgr", "rgb" or "yuv"
+        dst (str): destination color space, "bgr", "rgb" or "yuv"
+        standard (str): "bt709" or "bt601"
+        range (str): "limited" or "full"
 
     Returns:
-        [type]: yuv 444 BT709 limited image
+        tuple: (matrix, bias, low, high), matrix is 3x3, others are of size 3, all float64 and read only
     """
-    yuv_image = np.zeros_like(bgr_image, dtype='float')
 
-    bgr_image = bgr_image.astype(np.float32)
+    key = (standard, range)
 
-    #Y
-    yuv_image[:,:,0] = 16  + 0.183 * bgr_image[:,:,2] + 0.614 * bgr_image[:,:,1] + 0.062 * bgr_image[:,:,0]
+    if key not in _BGR_TO_YUV_MATRIX:
+        raise ValueError(f"Error: unsupported standard/range: {standard}/{range}")
 
-    #Cb
-    yuv_image[:,:,1] = 128 - 0.101 * bgr_image[:,:,2] - 0.339 * bgr_image[:,:,1] + 0.439 * bgr_image[:,:,0]
+    if src in ("bgr", "rgb") and dst == "yuv":
+        matrix = np.array(_BGR_TO_YUV_MATRIX[key])
+        if src == "rgb":
+            matrix = matrix[:, ::-1]
 
-    #Cr
-    yuv_image[:,:,2] = 128 + 0.439 * bgr_image[:,:,2] - 0.399 * bgr_image[:,:,1] - 0.040 * bgr_image[:,:,0]
+        bias = np.array(_YUV_OFFSET[range])
+        low, high = _YUV_CLIP_RANGE[range]
 
-    yuv_image[:,:,0] = np.clip(yuv_image[:,:,0], 16, 235)
-    yuv_image[:,:,1] = np.clip(yuv_image[:,:,1], 16, 240)
-    yuv_image[:,:,2] = np.clip(yuv_image[:,:,2], 16, 240)
+    elif src == "yuv" and dst in ("bgr", "rgb"):
+        matrix = np.array(_YUV_TO_BGR_MATRIX[key])
+        if dst == "rgb":
+            matrix = matrix[::-1, :]
 
-    return yuv_image
+        # bgr = matrix @ (yuv - offset)
+        bias = -matrix @ np.array(_YUV_OFFSET[range])
+        low, high = _BGR_CLIP_RANGE
 
-def convert_bgr_to_709_limited_yuv_single(b, g, r):
-    """convert_bgr_to_709_limited_yuv_single
+    else:
+        raise ValueError(f"Error: unsupported conversion: {src} --> {dst}")
 
-    Args:
-        b : blue channel
-        g : green channel
-        r : red channel
-    """
+    transform = (np.ascontiguousarray(matrix), bias, np.array(low), np.array(high))
 
-    y = 16  + 0.183 * r + 0.614 * g + 0.062 * b
-    u = 128 - 0.101 * r - 0.339 * g + 0.439 * b
-    v = 128 + 0.439 * r - 0.399 * g - 0.040 * b
+    for array in transform:
+        array.flags.writeable = False
 
-    y = np.clip(y, 16, 235)
-    u = np.clip(u, 16, 240)
-    v = np.clip(v, 16, 240)
+    return transform
 
-    return y, u, v
 
-def convert_709_limited_yuv_to_bgr(yuv_image):
-    """convert_709_limited_yuv_to_bgr
+@functools.lru_cache(maxsize=None)
+def get_fixed_point_transform(src="bgr", dst="yuv", standard="bt709", range="limited"):
+    """get fixed point version of get_affine_transform for 8 bit image
 
     Args:
-        bgr_image (np.array): yuv 444 BT709 limited image
+        src (str): source color space, "bgr", "rgb" or "yuv"
+        dst (str): destination color space, "bgr", "rgb" or "yuv"
+        standard (str): "bt709" or "bt601"
+        range (str): "limited" or "full"
 
     Returns:
-        [type]: bgr image
+        tuple: (matrix, bias, low, high), matrix is int16 in Q13, bias is int32 in Q13 with rounding term added,
+               low and high are int32, all read only
     """
 
-    bgr_image = np.zeros_like(yuv_image, dtype='float')
+    matrix, bias, low, high = get_affine_transform(src, dst, standard, range)
 
-    yuv_image = yuv_image.astype(np.float32)
+    scale = 1 << _FIXED_POINT_SHIFT
 
-    yuv_image_by_offset = np.zeros_like(yuv_image)
+    matrix_q = np.rint(matrix * scale).astype(np.int16)
+    bias_q   = np.rint(bias * scale).astype(np.int32) + (1 << (_FIXED_POINT_SHIFT - 1))
 
-    yuv_image_by_offset[:,:,0] = yuv_image[:,:,0] / 255.0 - 16.0 /255.0
-    yuv_image_by_offset[:,:,1] = yuv_image[:,:,1] / 255.0 - 0.5
-    yuv_image_by_offset[:,:,2] = yuv_image[:,:,2] / 255.0 - 0.5
+    transform = (matrix_q, bias_q, low.astype(np.int32), high.astype(np.int32))
 
-    #B
-    bgr_image[:,:,0] = 1.164 * yuv_image_by_offset[:,:,0] + 2.112 * yuv_image_by_offset[:,:,1] + 0.000 * yuv_image_by_offset[:,:,2]
+    for array in transform:
+        array.flags.writeable = False
 
-    #G
-    bgr_image[:,:,1] = 1.164 * yuv_image_by_offset[:,:,0] - 0.213 * yuv_image_by_offset[:,:,1] - 0.533 * yuv_image_by_offset[:,:,2]
+    return transform
 
-    #R
-    bgr_image[:,:,2] = 1.164 * yuv_image_by_offset[:,:,0] + 0.000 * yuv_image_by_offset[:,:,1] + 1.793 * yuv_image_by_offset[:,:,2]
 
-    bgr_image *= 255.0
+def _apply_fixed_point_transform(src_pixels, dst_pixels, matrix_q, bias_q, low, high):
+    """apply fixed point affine transform block by block, pixels are uint8 of size N * 3
 
-    return np.clip(bgr_image, 0, 255).astype(np.uint8)
+    Note: blocks are deinterleaved to planar int32, since numpy has no SIMD integer matmul,
+          while the per plane multiply-add is vectorized.
+    """
 
+    matrix_q = matrix_q.astype(np.int32)
 
-def convert_709_limited_yuv_to_bgr_single(y, u, v):
-    """convert_709_limited_yuv_to_bgr_single
+    pixel_num = src_pixels.shape[0]
+    block_size = max(1, min(_BLOCK_PIXELS, pixel_num))
+
+    src_buffer  = np.empty((3, block_size), dtype=np.int32)
+    dst_buffer  = np.empty((3, block_size), dtype=np.int32)
+    term_buffer = np.empty(block_size, dtype=np.int32)
+
+    for start in range(0, pixel_num, block_size):
+        stop = min(start + block_size, pixel_num)
+
+        src_block = src_buffer[:, :stop - start]
+        dst_block = dst_buffer[:, :stop - start]
+        term      = term_buffer[:stop - start]
+
+        src_block[...] = src_pixels[start:stop].T
+
+        for i in range(3):
+            np.multiply(src_block[0], matrix_q[i, 0], out=dst_block[i])
+            for j in (1, 2):
+                if matrix_q[i, j] != 0:
+                    np.multiply(src_block[j], matrix_q[i, j], out=term)
+                    dst_block[i] += term
+
+            dst_block[i] += bias_q[i]
+            np.right_shift(dst_block[i], _FIXED_POINT_SHIFT, out=dst_block[i])
+            np.clip(dst_block[i], low[i], high[i], out=dst_block[i])
+
+        dst_pixels[start:stop] = dst_block.T
+
+
+@functools.lru_cache(maxsize=None)
+def get_lookup_tables(src="bgr", dst="yuv", standard="bt709", range="limited"):
+    """get lookup tables version of get_affine_transform for 8 bit image
 
     Args:
-        y : y channel
-        u : u channel
-        v : v channel
+        src (str): source color space, "bgr", "rgb" or "yuv"
+        dst (str): destination color space, "bgr", "rgb" or "yuv"
+        standard (str): "bt709" or "bt601"
+        range (str): "limited" or "full"
+
+    Returns:
+        tuple: (tables, low, high), see build_lookup_tables, all read only
     """
 
-    y = y/255.0 - 16.0/255.0
-    u = u/255.0 - 0.5
-    v = v/255.0 - 0.5
+    matrix, bias, low, high = get_affine_transform(src, dst, standard, range)
 
-    b = 1.164 * y + 2.112 * u + 0.000 * v
-    g = 1.164 * y - 0.213 * u - 0.533 * v
-    r = 1.164 * y + 0.000 * u + 1.793 * v
+    transform = (build_lookup_tables(matrix, bias), low.astype(np.int32), high.astype(np.int32))
 
-    b = np.clip(b * 255.0, 0, 255)
-    g = np.clip(g * 255.0, 0, 255)
-    r = np.clip(r * 255.0, 0, 255)
+    for array in transform:
+        array.flags.writeable = False
 
-    return b, g, r
+    return transform
 
-    g = np.clip(g, 0, 255)
-    r = np.clip(r, 0, 255)
 
-    return b, g, r
+def build_lookup_tables(matrix, bias):
+    """build lookup tables of affine transform for 8 bit image
 
-def convert_bgr_to_709_full_yuv(bgr_image):
-    """convert_bgr_to_709_full_yuv
+    Args:
+        matrix (np.array): 3x3 matrix
+        bias (np.array): bias of size 3
+
+    Returns:
+        np.array: int32 tables of size 3 * 3 * 256 in Q13, tables[i, j, v] = matrix[i, j] * v,
+                  bias and rounding term are folded into tables[i, 0]
+    """
+
+    scale = 1 << _FIXED_POINT_SHIFT
+
+    values = np.arange(256, dtype=np.float64)
+
+    tables = np.rint(np.asarray(matrix, dtype=np.float64)[:, :, None] * values * scale).astype(np.int32)
+    tables[:, 0, :] += np.rint(np.asarray(bias, dtype=np.float64) * scale).astype(np.int32)[:, None] + (1 << (_FIXED_POINT_SHIFT - 1))
+
+    return tables
+
+
+def apply_lookup_tables(image, tables, low, high, out=None):
+    """apply lookup tables to 8 bit image, each output channel costs 3 gathers and 2 adds in int32
 
     Args:
-        bgr_image (np.array): bgr image
+        image (np.array): uint8 image of size height * width * 3
+        tables (np.array): tables built by build_lookup_tables
+        low (np.array): int32 lower bound of size 3
+        high (np.array): int32 upper bound of size 3
+        out (np.array, optional): C-contiguous uint8 output buffer of same shape as image, may be image itself.
+                                  Defaults to None.
 
     Returns:
-        [type]: yuv 444 BT709 full image
+        np.array: uint8 image
     """
-    yuv_image = np.zeros_like(bgr_image, dtype='float')
 
-    bgr_image = bgr_image.astype(np.float32)
+    if image.dtype != np.uint8 or image.ndim < 1 or image.shape[-1] != 3:
+        raise ValueError(f"Error: lookup tables only support uint8 image of 3 channels: {image.dtype}, {image.shape}")
 
-    #Y
-    yuv_image[:,:,0] = 0   + 0.213 * bgr_image[:,:,2] + 0.715 * bgr_image[:,:,1] + 0.072 * bgr_image[:,:,0]
+    if out is None:
+        out = np.empty(image.shape, dtype=np.uint8)
+    elif out.shape != image.shape or out.dtype != np.uint8 or not out.flags.c_contiguous:
+        raise ValueError(f"Error: out should be C-contiguous uint8 of shape {image.shape}")
 
-    #Cb
-    yuv_image[:,:,1] = 128 - 0.115 * bgr_image[:,:,2] - 0.385 * bgr_image[:,:,1] + 0.500 * bgr_image[:,:,0]
+    src_pixels = image.reshape(-1, 3)
+    dst_pixels = out.reshape(-1, 3)
 
-    #Cr
-    yuv_image[:,:,2] = 128 + 0.500 * bgr_image[:,:,2] - 0.454 * bgr_image[:,:,1] - 0.046 * bgr_image[:,:,0]
+    pixel_num = src_pixels.shape[0]
+    block_size = max(1, min(_BLOCK_PIXELS, pixel_num))
 
-    yuv_image[:,:,0] = np.clip(yuv_image[:,:,0], 0, 255)
-    yuv_image[:,:,1] = np.clip(yuv_image[:,:,1], 0, 255)
-    yuv_image[:,:,2] = np.clip(yuv_image[:,:,2], 0, 255)
+    dst_buffer  = np.empty(block_size, dtype=np.int32)
+    term_buffer = np.empty(block_size, dtype=np.int32)
 
-    return yuv_image
+    # NOTE: in place, channels of a block are read before any of them is written
+    src_buffer = np.empty((block_size, 3), dtype=np.uint8) if np.shares_memory(image, out) else None
 
-def convert_bgr_to_709_full_yuv_single(b, g, r):
-    """convert_bgr_to_709_full_yuv_single
+    for start in range(0, pixel_num, block_size):
+        stop = min(start + block_size, pixel_num)
+
+        src_block = src_pixels[start:stop]
+        if src_buffer is not None:
+            src_block = src_buffer[:stop - start]
+            src_block[...] = src_pixels[start:stop]
+        dst_block = dst_buffer[:stop - start]
+        term      = term_buffer[:stop - start]
+
+        for i in range(3):
+            np.take(tables[i, 0], src_block[:, 0], out=dst_block)
+            for j in (1, 2):
+                np.take(tables[i, j], src_block[:, j], out=term)
+                dst_block += term
+
+            np.right_shift(dst_block, _FIXED_POINT_SHIFT, out=dst_block)
+            np.clip(dst_block, low[i], high[i], out=dst_block)
+
+            dst_pixels[start:stop, i] = dst_block
+
+    return out
+
+
+def _apply_affine_transform(src_pixels, dst_pixels, matrix, bias, low, high):
+    """apply affine transform block by block, pixels are of size N * 3"""
+
+    work_dtype = np.float64 if dst_pixels.dtype == np.float64 else np.float32
+    integer_output = np.issubdtype(dst_pixels.dtype, np.integer)
+
+    matrix_t = matrix.T.astype(work_dtype)
+    bias = bias.astype(work_dtype)
+    low  = low.astype(work_dtype)
+    high = high.astype(work_dtype)
+
+    pixel_num = src_pixels.shape[0]
+    block_size = max(1, min(_BLOCK_PIXELS, pixel_num))
+
+    src_buffer = None if src_pixels.dtype == work_dtype else np.empty((block_size, 3), dtype=work_dtype)
+    dst_buffer = None if dst_pixels.dtype == work_dtype else np.empty((block_size, 3), dtype=work_dtype)
+
+    for start in range(0, pixel_num, block_size):
+        stop = min(start + block_size, pixel_num)
+
+        if src_buffer is None:
+            src_block = src_pixels[start:stop]
+        else:
+            src_block = src_buffer[:stop - start]
+            src_block[...] = src_pixels[start:stop]
+
+        dst_block = dst_pixels[start:stop] if dst_buffer is None else dst_buffer[:stop - start]
+
+        np.matmul(src_block, matrix_t, out=dst_block)
+        dst_block += bias
+        np.clip(dst_block, low, high, out=dst_block)
+
+        if dst_buffer is not None:
+            if integer_output:
+                np.rint(dst_block, out=dst_block)
+            dst_pixels[start:stop] = dst_block
+
+
+def convert(image, src="bgr", dst="yuv", standard="bt709", range="limited", out=None, dtype=np.float32, precision="float"):
+    """convert image between bgr/rgb and yuv 444 by one fused 3x3 transform
 
     Args:
-        b : blue channel
-        g : green channel
-        r : red channel
+        image (np.array): image of size height * width * 3
+        src (str): source color space, "bgr", "rgb" or "yuv"
+        dst (str): destination color space, "bgr", "rgb" or "yuv"
+        standard (str): "bt709" or "bt601"
+        range (str): "limited" or "full"
+        out (np.array, optional): C-contiguous output buffer of same shape as image. Defaults to None.
+        dtype (optional): output dtype if out is None, integer output is rounded. Defaults to np.float32.
+        precision (str, optional): "float", or "fixed"/"table" for uint8 image, which uses Q13 integer arithmetic
+                                   or cached lookup tables, and always outputs uint8. Defaults to "float".
+
+    Returns:
+        np.array: converted image, the same object as out if given
     """
 
-    y = 0   + 0.213 * r + 0.715 * g + 0.072 * b
-    u = 128 - 0.115 * r - 0.385 * g + 0.500 * b
-    v = 128 + 0.500 * r - 0.454 * g - 0.046 * b
+    if image.ndim < 1 or image.shape[-1] != 3:
+        raise ValueError(f"Error: image should have 3 channels: {image.shape}")
 
-    y = np.clip(y, 0, 255)
-    u = np.clip(u, 0, 255)
-    v = np.clip(v, 0, 255)
+    if precision in ("fixed", "table"):
+        if image.dtype != np.uint8:
+            raise ValueError(f"Error: {precision} precision only supports uint8 image: {image.dtype}")
+        dtype = np.uint8
+        if out is not None and out.dtype != np.uint8:
+            raise ValueError(f"Error: {precision} precision only supports uint8 out: {out.dtype}")
+    elif precision != "float":
+        raise ValueError(f"Error: unsupported precision: {precision}")
 
-    return y, u, v
+    if out is None:
+        out = np.empty(image.shape, dtype=dtype)
+    elif out.shape != image.shape or not out.flags.c_contiguous:
+        raise ValueError(f"Error: out should be C-contiguous of shape {image.shape}")
+
+    key = (src.lower(), dst.lower(), standard.lower(), range.lower())
+
+    if precision == "table":
+        apply_lookup_tables(image, *get_lookup_tables(*key), out=out)
+    elif precision == "fixed":
+        _apply_fixed_point_transform(image.reshape(-1, 3), out.reshape(-1, 3), *get_fixed_point_transform(*key))
+    else:
+        _apply_affine_transform(image.reshape(-1, 3), out.reshape(-1, 3), *get_affine_transform(*key))
+
+    return out
 
-def convert_709_full_yuv_to_bgr(yuv_image):
-    """convert_709_full_yuv_to_bgr
+
+def split_i420_planes(yuv_420_image):
+    """split i420 image into zero-copy y, u, v plane views
 
     Args:
-        bgr_image (np.array): yuv 444 BT709 full image
+        yuv_420_image (np.array): i420 image of size (height * 3 / 2) * width
 
     Returns:
-        [type]: bgr image
+        tuple: (y, u, v) planes of size height * width, (height / 2) * (width / 2) and (height / 2) * (width / 2)
     """
 
-    bgr_image = np.zeros_like(yuv_image, dtype='float')
+    image_height = yuv_420_image.shape[0] * 2 // 3
+    image_width  = yuv_420_image.shape[1]
 
-    yuv_image = yuv_image.astype(np.float32)
+    if yuv_420_image.shape[0] != image_height * 3 // 2 or image_height % 2 or image_width % 2:
+        raise ValueError(f"Error: invalid i420 image size: {yuv_420_image.shape}")
 
-    yuv_image_by_offset = np.zeros_like(yuv_image)
+    u_end_height = v_start_height = image_height * 5 // 4
 
-    yuv_image_by_offset[:,:,0] = yuv_image[:,:,0] / 255.0
-    yuv_image_by_offset[:,:,1] = yuv_image[:,:,1] / 255.0 - 0.5
-    yuv_image_by_offset[:,:,2] = yuv_image[:,:,2] / 255.0 - 0.5
+    uv_height = image_height // 2
+    uv_width  = image_width // 2
 
-    #B
-    bgr_image[:,:,0] = 1.000 * yuv_image_by_offset[:,:,0] + 1.856 * yuv_image_by_offset[:,:,1] + 0.000 * yuv_image_by_offset[:,:,2]
+    y_plane = yuv_420_image[0:image_height]
+    u_plane = yuv_420_image[image_height: u_end_height].reshape(uv_height, uv_width)
+    v_plane = yuv_420_image[v_start_height: ].reshape(uv_height, uv_width)
 
-    #G
-    bgr_image[:,:,1] = 1.000 * yuv_image_by_offset[:,:,0] - 0.187 * yuv_image_by_offset[:,:,1] - 0.468 * yuv_image_by_offset[:,:,2]
+    return y_plane, u_plane, v_plane
 
-    #R
-    bgr_image[:,:,2] = 1.000 * yuv_image_by_offset[:,:,0] + 0.000 * yuv_image_by_offset[:,:,1] + 1.575 * yuv_image_by_offset[:,:,2]
 
-    bgr_image *= 255.0
+# chroma rows processed per block in i420 conversion, 2 luma rows each
+I420_BLOCK_ROWS = 16
 
-    return np.clip(bgr_image, 0, 255).astype(np.uint8)
 
-def convert_709_full_yuv_to_bgr_single(y, u, v):
-    """convert_709_full_yuv_to_bgr_single
+def iter_blocks(length, block_size):
+    """iterate blocks of [0, length), usable where builtin range is shadowed by argument
 
     Args:
-        y : y channel
-        u : u channel
-        v : v channel
+        length (int): total length
+        block_size (int): length of each block, the last one may be shorter
+
+    Yields:
+        tuple: (start, stop) of each block
     """
-    y = y/255.0
-    u = u/255.0 - 0.5
-    v = v/255.0 - 0.5
 
-    b = 1.000 * y + 1.856 * u + 0.000 * v
-    g = 1.000 * y - 0.187 * u - 0.468 * v
-    r = 1.000 * y + 0.000 * u + 1.575 * v
+    for start in range(0, length, block_size):
+        yield start, min(start + block_size, length)
 
-    b = np.clip(b * 255.0, 0, 255)
-    g = np.clip(g * 255.0, 0, 255)
-    r = np.clip(r * 255.0, 0, 255)
 
-    return b, g, r
+def convert_i420_to_bgr(yuv_420_image, standard="bt709", range="limited", out=None):
+    """convert i420 image to bgr directly, without yuv 444 intermediate
 
-def convert_bgr_to_601_limited_yuv(bgr_image):
-    """convert_bgr_to_601_limited_yuv
+    Each 2x2 luma block is converted against its shared chroma sample, the chroma part of
+    the transform is computed once per chroma sample.
 
     Args:
-        bgr_image (np.array): bgr image
+        yuv_420_image (np.array): uint8 yuv 420 image of size (height * 3 / 2) * width
+        standard (str): "bt709" or "bt601"
+        range (str): "limited" or "full"
+        out (np.array, optional): uint8 output buffer of size height * width * 3. Defaults to None.
 
     Returns:
-        [type]: yuv 444 BT601 limited image
+        np.array: uint8 bgr image of size height * width * 3
     """
-    yuv_image = np.zeros_like(bgr_image, dtype='float')
 
-    bgr_image = bgr_image.astype(np.float32)
+    y_plane, u_plane, v_plane = split_i420_planes(yuv_420_image)
 
-    #Y
-    yuv_image[:,:,0] = 16  + 0.257 * bgr_image[:,:,2] + 0.504 * bgr_image[:,:,1] + 0.098 * bgr_image[:,:,0]
+    image_height, image_width = y_plane.shape
 
-    #Cb
-    yuv_image[:,:,1] = 128 - 0.148 * bgr_image[:,:,2] - 0.291 * bgr_image[:,:,1] + 0.439 * bgr_image[:,:,0]
+    if out is None:
+        out = np.empty((image_height, image_width, 3), dtype=np.uint8)
+    elif out.shape != (image_height, image_width, 3):
+        raise ValueError(f"Error: out should be of shape {(image_height, image_width, 3)}")
 
-    #Cr
-    yuv_image[:,:,2] = 128 + 0.439 * bgr_image[:,:,2] - 0.368 * bgr_image[:,:,1] - 0.071 * bgr_image[:,:,0]
+    matrix, bias, low, high = get_affine_transform("yuv", "bgr", standard.lower(), range.lower())
 
-    yuv_image[:,:,0] = np.clip(yuv_image[:,:,0], 16, 235)
-    yuv_image[:,:,1] = np.clip(yuv_image[:,:,1], 16, 240)
-    yuv_image[:,:,2] = np.clip(yuv_image[:,:,2], 16, 240)
+    matrix = matrix.astype(np.float32)
+    bias   = bias.astype(np.float32)
 
-    return yuv_image
+    uv_height = u_plane.shape[0]
 
-def convert_bgr_to_601_limited_yuv_single(b, g, r):
-    """convert_bgr_to_601_limited_yuv_single
+    for start, stop in iter_blocks(uv_height, I420_BLOCK_ROWS):
+        u_block = u_plane[start:stop].astype(np.float32)
+        v_block = v_plane[start:stop].astype(np.float32)
 
-    Args:
-        b : blue channel
-        g : green channel
-        r : red channel
-    """
-    y = 16 + 0.257 * r + 0.504 * g + 0.098 * b
-    u = 128 - 0.148 * r - 0.291 * g + 0.439 * b
-    v = 128 + 0.439 * r - 0.368 * g - 0.071 * b
+        y_block   = y_plane[2 * start: 2 * stop]
+        out_block = out[2 * start: 2 * stop]
 
-    y = np.clip(y, 16, 235)
-    u = np.clip(u, 16, 240)
-    v = np.clip(v, 16, 240)
+        for i in (0, 1, 2):
+            chroma = matrix[i, 1] * u_block + matrix[i, 2] * v_block + bias[i]
 
-    return y, u, v
+            for dy in (0, 1):
+                for dx in (0, 1):
+                    channel = matrix[i, 0] * y_block[dy::2, dx::2] + chroma
+                    np.clip(channel, low[i], high[i], out=channel)
+                    out_block[dy::2, dx::2, i] = np.rint(channel, out=channel)
 
-def convert_601_limited_yuv_to_bgr(yuv_image):
-    """convert_601_limited_yuv_to_bgr
+    return out
+
+
+def convert_bgr_to_i420(bgr_image, standard="bt709", range="limited", out=None):
+    """convert bgr image to i420 directly, without yuv 444 intermediate
+
+    Chroma is taken from the box filtered bgr of each 2x2 block, which equals averaging the
+    chroma of yuv 444 as convert_yuv_444_to_420 does.
 
     Args:
-        bgr_image (np.array): yuv 444 BT601 limited image
+        bgr_image (np.array): bgr image of size height * width * 3, height and width should be even
+        standard (str): "bt709" or "bt601"
+        range (str): "limited" or "full"
+        out (np.array, optional): C-contiguous uint8 output buffer of size (height * 3 / 2) * width. Defaults to None.
 
     Returns:
-        [type]: bgr image
+        np.array: uint8 yuv 420 image of size (height * 3 / 2) * width
     """
 
-    bgr_image = np.zeros_like(yuv_image, dtype='float')
+    image_height, image_width = bgr_image.shape[:2]
 
-    yuv_image = yuv_image.astype(np.float32)
+    if bgr_image.ndim != 3 or bgr_image.shape[2] != 3 or image_height % 2 or image_width % 2:
+        raise ValueError(f"Error: invalid bgr image size: {bgr_image.shape}")
 
-    yuv_image_by_offset = np.zeros_like(yuv_image)
+    yuv_height = image_height * 3 // 2
 
-    yuv_image_by_offset[:,:,0] = yuv_image[:,:,0] / 255.0 - 16.0 /255.0
-    yuv_image_by_offset[:,:,1] = yuv_image[:,:,1] / 255.0 - 0.5
-    yuv_image_by_offset[:,:,2] = yuv_image[:,:,2] / 255.0 - 0.5
+    if out is None:
+        out = np.empty((yuv_height, image_width), dtype=np.uint8)
+    elif out.shape != (yuv_height, image_width) or not out.flags.c_contiguous:
+        raise ValueError(f"Error: out should be C-contiguous of shape {(yuv_height, image_width)}")
 
-    #B
-    bgr_image[:,:,0] = 1.164 * yuv_image_by_offset[:,:,0] + 2.017 * yuv_image_by_offset[:,:,1] + 0.000 * yuv_image_by_offset[:,:,2]
+    y_plane, u_plane, v_plane = split_i420_planes(out)
 
-    #G
-    bgr_image[:,:,1] = 1.164 * yuv_image_by_offset[:,:,0] - 0.392 * yuv_image_by_offset[:,:,1] - 0.813 * yuv_image_by_offset[:,:,2]
+    matrix, bias, low, high = get_affine_transform("bgr", "yuv", standard.lower(), range.lower())
 
-    #R
-    bgr_image[:,:,2] = 1.164 * yuv_image_by_offset[:,:,0] + 0.000 * yuv_image_by_offset[:,:,1] + 1.596 * yuv_image_by_offset[:,:,2]
+    matrix = matrix.astype(np.float32)
+    bias   = bias.astype(np.float32)
 
-    bgr_image *= 255.0
+    uv_height = u_plane.shape[0]
 
-    return np.clip(bgr_image, 0, 255).astype(np.uint8)
+    for start, stop in iter_blocks(uv_height, I420_BLOCK_ROWS):
+        bgr_block = bgr_image[2 * start: 2 * stop].astype(np.float32)
 
-def convert_601_limited_yuv_to_bgr_single(y, u, v):
-    """convert_601_limited_yuv_to_bgr_single
+        luma = bgr_block @ matrix[0] + bias[0]
+        np.clip(luma, low[0], high[0], out=luma)
+        y_plane[2 * start: 2 * stop] = np.rint(luma, out=luma)
+
+        bgr_mean = bgr_block[0::2, 0::2] + bgr_block[0::2, 1::2]
+        bgr_mean += bgr_block[1::2, 0::2]
+        bgr_mean += bgr_block[1::2, 1::2]
+        bgr_mean *= 0.25
+
+        for i, plane in ((1, u_plane), (2, v_plane)):
+            chroma = bgr_mean @ matrix[i] + bias[i]
+            np.clip(chroma, low[i], high[i], out=chroma)
+            plane[start:stop] = np.rint(chroma, out=chroma)
+
+    return out
+
+
+def _convert_single(c0, c1, c2, src, dst, standard, range):
+    """convert single pixel (or per channel arrays) by the affine transform, not rounded"""
+
+    matrix, bias, low, high = get_affine_transform(src, dst, standard, range)
+
+    return tuple(np.clip(matrix[i, 0] * c0 + matrix[i, 1] * c1 + matrix[i, 2] * c2 + bias[i], low[i], high[i])
+                 for i in (0, 1, 2))
+
+
+def convert_bgr_to_709_limited_yuv(bgr_image, out=None, precision="float"):
+    """convert_bgr_to_709_limited_yuv
+
+    Args:
+        bgr_image (np.array): bgr image
+        out (np.array, optional): output buffer. Defaults to None.
+        precision (str, optional): "float", "fixed" or "table", see convert. Defaults to "float".
+
+    Returns:
+        [type]: yuv 444 BT709 limited image
+    """
+    return convert(bgr_image, "bgr", "yuv", "bt709", "limited", out=out, dtype=np.float64, precision=precision)
+
+def convert_bgr_to_709_limited_yuv_single(b, g, r):
+    """convert_bgr_to_709_limited_yuv_single
+
+    Args:
+        b : blue channel
+        g : green channel
+        r : red channel
+    """
+    return _convert_single(b, g, r, "bgr", "yuv", "bt709", "limited")
+
+def convert_709_limited_yuv_to_bgr(yuv_image, out=None, precision="float"):
+    """convert_709_limited_yuv_to_bgr
+
+    Args:
+        yuv_image (np.array): yuv 444 BT709 limited image
+        out (np.array, optional): output buffer. Defaults to None.
+        precision (str, optional): "float", "fixed" or "table", see convert. Defaults to "float".
+
+    Returns:
+        [type]: bgr image
+    """
+    return convert(yuv_image, "yuv", "bgr", "bt709", "limited", out=out, dtype=np.uint8, precision=precision)
+
+def convert_709_limited_yuv_to_bgr_single(y, u, v):
+    """convert_709_limited_yuv_to_bgr_single
 
     Args:
         y : y channel
         u : u channel
         v : v channel
     """
-    y = y/255.0 - 16.0/255.0
-    u = u/255.0 - 0.5
-    v = v/255.0 - 0.5
+    return _convert_single(y, u, v, "yuv", "bgr", "bt709", "limited")
 
-    b = 1.164 * y + 2.017 * u + 0.000 * v
-    g = 1.164 * y - 0.392 * u - 0.813 * v
-    r = 1.164 * y + 0.000 * u + 1.596 * v
+def convert_bgr_to_709_full_yuv(bgr_image, out=None, precision="float"):
+    """convert_bgr_to_709_full_yuv
 
-    b = np.clip(b * 255.0, 0, 255)
-    g = np.clip(g * 255.0, 0, 255)
-    r = np.clip(r * 255.0, 0, 255)
+    Args:
+        bgr_image (np.array): bgr image
+        out (np.array, optional): output buffer. Defaults to None.
+        precision (str, optional): "float", "fixed" or "table", see convert. Defaults to "float".
 
-    return b, g, r
+    Returns:
+        [type]: yuv 444 BT709 full image
+    """
+    return convert(bgr_image, "bgr", "yuv", "bt709", "full", out=out, dtype=np.float64, precision=precision)
 
-def convert_bgr_to_601_full_yuv(bgr_image):
-    """convert_bgr_to_601_full_yuv
+def convert_bgr_to_709_full_yuv_single(b, g, r):
+    """convert_bgr_to_709_full_yuv_single
 
     Args:
-        bgr_image (np.array): bgr image
+        b : blue channel
+        g : green channel
+        r : red channel
+    """
+    return _convert_single(b, g, r, "bgr", "yuv", "bt709", "full")
+
+def convert_709_full_yuv_to_bgr(yuv_image, out=None, precision="float"):
+    """convert_709_full_yuv_to_bgr
+
+    Args:
+        yuv_image (np.array): yuv 444 BT709 full image
+        out (np.array, optional): output buffer. Defaults to None.
+        precision (str, optional): "float", "fixed" or "table", see convert. Defaults to "float".
 
     Returns:
-        [type]: yuv 444 BT601 full image
+        [type]: bgr image
     """
-    yuv_image = np.zeros_like(bgr_image, dtype='float')
+    return convert(yuv_image, "yuv", "bgr", "bt709", "full", out=out, dtype=np.uint8, precision=precision)
 
-    bgr_image = bgr_image.astype(np.float32)
+def convert_709_full_yuv_to_bgr_single(y, u, v):
+    """convert_709_full_yuv_to_bgr_single
 
-    #Y
-    yuv_image[:,:,0] = 0   + 0.299 * bgr_image[:,:,2] + 0.587 * bgr_image[:,:,1] + 0.114 * bgr_image[:,:,0]
+    Args:
+        y : y channel
+        u : u channel
+        v : v channel
+    """
+    return _convert_single(y, u, v, "yuv", "bgr", "bt709", "full")
 
-    #Cb
-    yuv_image[:,:,1] = 128 - 0.169 * bgr_image[:,:,2] - 0.331 * bgr_image[:,:,1] + 0.500 * bgr_image[:,:,0]
+def convert_bgr_to_601_limited_yuv(bgr_image, out=None, precision="float"):
+    """convert_bgr_to_601_limited_yuv
 
-    #Cr
-    yuv_image[:,:,2] = 128 + 0.500 * bgr_image[:,:,2] - 0.419 * bgr_image[:,:,1] - 0.081 * bgr_image[:,:,0]
+    Args:
+        bgr_image (np.array): bgr image
+        out (np.array, optional): output buffer. Defaults to None.
+        precision (str, optional): "float", "fixed" or "table", see convert. Defaults to "float".
 
-    return np.clip(yuv_image, 0, 255).astype(np.uint8)
+    Returns:
+        [type]: yuv 444 BT601 limited image
+    """
+    return convert(bgr_image, "bgr", "yuv", "bt601", "limited", out=out, dtype=np.float64, precision=precision)
 
-def convert_bgr_to_601_full_yuv_single(b, g, r):
-    """convert_bgr_to_601_full_yuv_single
+def convert_bgr_to_601_limited_yuv_single(b, g, r):
+    """convert_bgr_to_601_limited_yuv_single
 
     Args:
         b : blue channel
         g : green channel
         r : red channel
     """
-    y = 0   + 0.299 * r + 0.587 * g + 0.114 * b
-    u = 128 - 0.169 * r - 0.331 * g + 0.500 * b
-    v = 128 + 0.500 * r - 0.419 * g - 0.081 * b
-
-    y = np.clip(y, 0, 255)
-    u = np.clip(u, 0, 255)
-    v = np.clip(v, 0, 255)
+    return _convert_single(b, g, r, "bgr", "yuv", "bt601", "limited")
 
-    return y, u, v
-
-def convert_601_full_yuv_to_bgr(yuv_image):
-    """convert_601_full_yuv_to_bgr
+def convert_601_limited_yuv_to_bgr(yuv_image, out=None, precision="float"):
+    """convert_601_limited_yuv_to_bgr
 
     Args:
-        bgr_image (np.array): yuv 444 BT601 full image
+        yuv_image (np.array): yuv 444 BT601 limited image
+        out (np.array, optional): output buffer. Defaults to None.
+        precision (str, optional): "float", "fixed" or "table", see convert. Defaults to "float".
 
     Returns:
         [type]: bgr image
     """
+    return convert(yuv_image, "yuv", "bgr", "bt601", "limited", out=out, dtype=np.uint8, precision=precision)
 
-    bgr_image = np.zeros_like(yuv_image, dtype='float')
+def convert_601_limited_yuv_to_bgr_single(y, u, v):
+    """convert_601_limited_yuv_to_bgr_single
 
-    yuv_image = yuv_image.astype(np.float32)
+    Args:
+        y : y channel
+        u : u channel
+        v : v channel
+    """
+    return _convert_single(y, u, v, "yuv", "bgr", "bt601", "limited")
 
-    yuv_image_by_offset = np.zeros_like(yuv_image)
+def convert_bgr_to_601_full_yuv(bgr_image, out=None, precision="float"):
+    """convert_bgr_to_601_full_yuv
 
-    yuv_image_by_offset[:,:,0] = yuv_image[:,:,0] / 255.0
-    yuv_image_by_offset[:,:,1] = yuv_image[:,:,1] / 255.0 - 0.5
-    yuv_image_by_offset[:,:,2] = yuv_image[:,:,2] / 255.0 - 0.5
+    Args:
+        bgr_image (np.array): bgr image
+        out (np.array, optional): output buffer. Defaults to None.
+        precision (str, optional): "float", "fixed" or "table", see convert. Defaults to "float".
+
+    Returns:
+        [type]: yuv 444 BT601 full image
+    """
+    return convert(bgr_image, "bgr", "yuv", "bt601", "full", out=out, dtype=np.uint8, precision=precision)
 
-    #B
-    bgr_image[:,:,0] = 1.000 * yuv_image_by_offset[:,:,0] + 1.772 * yuv_image_by_offset[:,:,1] + 0.000 * yuv_image_by_offset[:,:,2]
+def convert_bgr_to_601_full_yuv_single(b, g, r):
+    """convert_bgr_to_601_full_yuv_single
 
-    #G
-    bgr_image[:,:,1] = 1.000 * yuv_image_by_offset[:,:,0] - 0.344 * yuv_image_by_offset[:,:,1] - 0.714 * yuv_image_by_offset[:,:,2]
+    Args:
+        b : blue channel
+        g : green channel
+        r : red channel
+    """
+    return _convert_single(b, g, r, "bgr", "yuv", "bt601", "full")
 
-    #R
-    bgr_image[:,:,2] = 1.000 * yuv_image_by_offset[:,:,0] + 0.000 * yuv_image_by_offset[:,:,1] + 1.402 * yuv_image_by_offset[:,:,2]
+def convert_601_full_yuv_to_bgr(yuv_image, out=None, precision="float"):
+    """convert_601_full_yuv_to_bgr
 
-    bgr_image *= 255.0
+    Args:
+        yuv_image (np.array): yuv 444 BT601 full image
+        out (np.array, optional): output buffer. Defaults to None.
+        precision (str, optional): "float", "fixed" or "table", see convert. Defaults to "float".
 
-    return np.clip(bgr_image, 0, 255).astype(np.uint8)
+    Returns:
+        [type]: bgr image
+    """
+    return convert(yuv_image, "yuv", "bgr", "bt601", "full", out=out, dtype=np.uint8, precision=precision)
 
 def convert_601_full_yuv_to_bgr_single(y, u, v):
     """convert_601_full_yuv_to_bgr_single
@@ -481,18 +900,21 @@ def convert_601_full_yuv_to_bgr_single(y, u, v):
         u : u channel
         v : v channel
     """
-    y = y/255.0
-    u = u/255.0 - 0.5
-    v = v/255.0 - 0.5
+    return _convert_single(y, u, v, "yuv", "bgr", "bt601", "full")
+
+#TODO(Chen Wei): add other versions
 
-    b = 1.000 * y + 1.772 * u + 0.000 * v
-    g = 1.000 * y - 0.344 * u - 0.714 * v
-    r = 1.000 * y + 0.000 * u + 1.402 * v
+if __name__ == '__main__':
 
-    b = np.clip(b * 255.0, 0, 255)
-    g = np.clip(g * 255.0, 0, 255)
-    r = np.clip(r * 255.0, 0, 255)
+    import time
 
-    return b, g, r
+    # benchmark of precisions, run by: python -m orion.yuv
+    for height, width in ((1080, 1920), (2160, 3840)):
+        bgr_image = np.random.randint(0, 256, (height, width, 3), dtype=np.uint8)
+        yuv_image = np.empty_like(bgr_image)
 
-#TODO(Chen Wei): add other versions
\ No newline at end of file
+        for precision in ("float", "fixed", "table"):
+            start = time.perf_counter()
+            for _ in range(5):
+                convert(bgr_image, "bgr", "yuv", out=yuv_image, precision=precision)
+            print(f"{width}x{height} {precision}: {(time.perf_counter() - start) / 5 * 1000:.1f} ms")
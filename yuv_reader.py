@@ -11,9 +11,15 @@
 
 import os
 import re
+import queue
+import threading
 import cv2
 import numpy as np
 
+from . import cache
+from . import pixel_format
+from . import y4m
+
 #Note(Chen Wei): to improve futher
 
 class YuvReader:
@@ -22,23 +28,150 @@ class YuvReader:
         """init empty reader"""
         pass
 
-    def __init__(self, filename):
-        """init reader by filename """
-        self.open(filename)
+    def __init__(self, filename, pix_fmt="i420", mmap=False, cache_bytes=0):
+        """init reader by filename
 
-    def open(self, filename):
-        self.filename = filename
+        Args:
+            filename (str): raw yuv file name, containing size as _WxH., or y4m file name (*.y4m)
+            pix_fmt (str, optional): pixel format of raw yuv, see pixel_format.PIXEL_FORMATS,
+                                     y4m uses the colorspace of its header. Defaults to "i420".
+            mmap (bool, optional): memory map the whole file, frames are returned as zero-copy views. Defaults to False.
+            cache_bytes (int, optional): capacity of LRU cache of frames and derived products (e.g., bgr),
+                                         0 to disable. Cached arrays are read-only. Defaults to 0.
+        """
+        self.open(filename, pix_fmt, mmap, cache_bytes)
 
-        size = re.search(r'_(\d+)x(\d+)\.', filename)
-        self.width  = int(size.group(1))
-        self.height = int(size.group(2))
+    def open(self, filename, pix_fmt="i420", mmap=False, cache_bytes=0):
+        self.filename = filename
 
-        self.framesize = int(self.width * self.height * 3 / 2)
+        self.cache = cache.LruCache(cache_bytes) if cache_bytes > 0 else None
 
         self.filesize = os.path.getsize(filename)
-        self.framenum = int(self.filesize / self.framesize)
 
-        self.file = open(filename, 'rb')
+        # frame data of raw yuv and of y4m are at data_offset + idx * frame_stride,
+        # unless frame_offsets is not None, i.e., y4m with varied FRAME headers
+        self.frame_offsets = None
+
+        if y4m.is_y4m_file(filename):
+            with open(filename, 'rb') as file:
+                self.y4m_header, header_size = y4m.read_header(file)
+
+            self.width  = self.y4m_header["width"]
+            self.height = self.y4m_header["height"]
+
+            self.pix_fmt = pixel_format.get_pixel_format(self.y4m_header["pix_fmt"])
+            self.framesize = self.pix_fmt.get_frame_size(self.width, self.height)
+
+            offsets = y4m.load_frame_offsets(filename, header_size, self.framesize)
+
+            self.framenum = len(offsets)
+            self.data_offset = int(offsets[0]) if self.framenum > 0 else header_size
+            self.frame_stride = int(offsets[1] - offsets[0]) if self.framenum > 1 else self.framesize + len(y4m.FRAME_SIGNATURE) + 1
+
+            if np.any(offsets != self.data_offset + np.arange(self.framenum) * self.frame_stride):
+                self.frame_offsets = offsets
+        else:
+            self.y4m_header = None
+
+            size = re.search(r'_(\d+)x(\d+)\.', filename)
+            self.width  = int(size.group(1))
+            self.height = int(size.group(2))
+
+            self.pix_fmt = pixel_format.get_pixel_format(pix_fmt)
+            self.framesize = self.pix_fmt.get_frame_size(self.width, self.height)
+
+            self.framenum = int(self.filesize / self.framesize)
+            self.data_offset = 0
+            self.frame_stride = self.framesize
+
+        self.file = None
+        self.frames = None
+
+        frame_shape = self.pix_fmt.get_frame_shape(self.width, self.height)
+
+        # NOTE: y4m with varied FRAME headers can not be mapped as one strided array, read from file instead
+        if mmap and self.frame_offsets is None:
+            # NOTE: np.memmap can not map empty file
+            if self.framenum > 0:
+                buffer = np.memmap(filename, dtype=np.uint8, mode='r')
+                frames = np.lib.stride_tricks.as_strided(buffer[self.data_offset:], shape=(self.framenum, self.framesize),
+                                                         strides=(self.frame_stride, 1), writeable=False)
+                self.frames = frames.view(self.pix_fmt.dtype).reshape((self.framenum,) + frame_shape)
+            else:
+                self.frames = np.empty((0,) + frame_shape, dtype=self.pix_fmt.dtype)
+        else:
+            self.file = open(filename, 'rb')
+
+    def get_frame_offset(self, idx):
+        """get file offset of frame data"""
+
+        if self.frame_offsets is not None:
+            return int(self.frame_offsets[idx])
+
+        return self.data_offset + idx * self.frame_stride
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+        self.frames = None
+
+        if self.cache is not None:
+            self.cache.clear()
+
+    def get_cache_stats(self):
+        """get frame cache statistics, see cache.LruCache.get_stats, None if cache disabled"""
+
+        return None if self.cache is None else self.cache.get_stats()
+
+    def get_cached(self, key, idx, compute):
+        """get derived product of frame, cached under (key, idx) if cache enabled
+
+        Args:
+            key (str): product name, e.g., "bgr"
+            idx (int): frame index
+            compute (callable): compute(frame) --> np.array
+
+        Returns:
+            np.array: product, read-only if cached
+        """
+
+        if self.cache is None:
+            return compute(self.get_frame(idx))
+
+        def compute_readonly():
+            product = compute(self.get_frame(idx))
+            product.flags.writeable = False
+            return product
+
+        return self.cache.get_or_compute((key, idx), compute_readonly)
+
+    def __len__(self):
+        return self.framenum
+
+    def __getitem__(self, key):
+        """reader[idx] or reader[start:stop:step], zero-copy views for mmap reader"""
+
+        if isinstance(key, slice):
+            if self.frames is not None:
+                return self.frames[key]
+
+            indices = range(*key.indices(self.framenum))
+
+            if indices.step == 1:
+                return self.read_frames(indices.start, len(indices))
+
+            frames = np.empty((len(indices),) + self.pix_fmt.get_frame_shape(self.width, self.height), dtype=self.pix_fmt.dtype)
+            for i, idx in enumerate(indices):
+                self.get_frame(idx, out=frames[i])
+
+            return frames
+
+        if key < 0:
+            key += self.framenum
+
+        return self.get_frame(key)
 
     def get_width(self):
         return self.width
@@ -55,23 +188,221 @@ class YuvReader:
     def get_frame_size(self):
         return self.framesize
 
-    def get_frame(self, idx):
-        if idx >= self.framenum:
-            raise IndexError("index out of range")
+    def get_pixel_format(self):
+        return self.pix_fmt
+
+    def get_fps(self):
+        """get fps as "num:den" of y4m, None for raw yuv"""
+        return None if self.y4m_header is None else self.y4m_header["fps"]
 
-        self.file.seek(idx * self.framesize)
+    def is_mmap(self):
+        return self.frames is not None
+
+    def _check_buffer(self, out, shape):
+        if out.shape != shape or out.dtype != self.pix_fmt.dtype or not out.flags.c_contiguous:
+            raise ValueError(f"Error: out should be C-contiguous {self.pix_fmt.dtype} of shape {shape}")
+
+    def _read(self, idx):
+        """read frame bytes at current file position"""
 
         buffer = self.file.read(self.framesize)
 
-        yuv = np.frombuffer(buffer, np.uint8).reshape(int(self.height * 3 / 2), self.width)
+        if len(buffer) != self.framesize:
+            raise IOError(f"Error: incomplete frame {idx} of {self.filename}")
+
+        return buffer
+
+    def get_frame(self, idx, out=None):
+        """get frame
+
+        Args:
+            idx (int): frame index
+            out (np.array, optional): C-contiguous buffer of frame shape to read into. Defaults to None.
+
+        Returns:
+            np.array: frame, the same object as out if given, a read-only view for mmap reader otherwise
+        """
+        if idx < 0 or idx >= self.framenum:
+            raise IndexError("index out of range")
+
+        frame_shape = self.pix_fmt.get_frame_shape(self.width, self.height)
+
+        if out is not None:
+            self._check_buffer(out, frame_shape)
+
+        # NOTE: mmap frames are served by page cache, only cache frames read from file
+        if self.cache is not None and self.frames is None:
+            yuv = self.cache.get(("frame", idx))
+
+            if yuv is None:
+                self.file.seek(self.get_frame_offset(idx))
+                yuv = np.frombuffer(self._read(idx), self.pix_fmt.dtype).reshape(frame_shape)
+                self.cache.put(("frame", idx), yuv)
+
+            if out is None:
+                return yuv
+
+            out[...] = yuv
+            return out
+
+        if self.frames is not None:
+            if out is None:
+                return self.frames[idx]
+
+            out[...] = self.frames[idx]
+            return out
+
+        self.file.seek(self.get_frame_offset(idx))
+
+        if out is not None:
+            if self.file.readinto(out) != self.framesize:
+                raise IOError(f"Error: incomplete frame {idx} of {self.filename}")
+            return out
+
+        buffer = self._read(idx)
+
+        yuv = np.frombuffer(buffer, self.pix_fmt.dtype).reshape(frame_shape)
 
         return yuv
 
+    def read_frames(self, start, count, out=None):
+        """read contiguous frames by one read
+
+        Args:
+            start (int): first frame index
+            count (int): frame count
+            out (np.array, optional): C-contiguous buffer of shape (count, *frame shape). Defaults to None.
+
+        Returns:
+            np.array: frames of shape (count, *frame shape), the same object as out if given,
+                      a read-only view for mmap reader otherwise
+        """
+        if start < 0 or count < 0 or start + count > self.framenum:
+            raise IndexError("index out of range")
+
+        shape = (count,) + self.pix_fmt.get_frame_shape(self.width, self.height)
+
+        if out is not None:
+            self._check_buffer(out, shape)
+
+        if self.frames is not None:
+            if out is None:
+                return self.frames[start: start + count]
+
+            out[...] = self.frames[start: start + count]
+            return out
+
+        if out is None:
+            out = np.empty(shape, dtype=self.pix_fmt.dtype)
+
+        # NOTE: frames of y4m are separated by FRAME headers, read one by one
+        if self.frame_offsets is not None or self.frame_stride != self.framesize:
+            for i in range(count):
+                self.get_frame(start + i, out=out[i])
+            return out
+
+        self.file.seek(self.get_frame_offset(start))
+
+        if self.file.readinto(out) != count * self.framesize:
+            raise IOError(f"Error: incomplete frames {start} .. {start + count - 1} of {self.filename}")
+
+        return out
+
+    def iter_frames(self, start=0, stop=None, prefetch=8):
+        """iterate frames in order, reading ahead in background thread
+
+        for idx, frame in reader.iter_frames(prefetch=8):
+            ...
+
+        Args:
+            start (int, optional): first frame index. Defaults to 0.
+            stop (int, optional): end frame index (exclusive). Defaults to None, i.e., frame num.
+            prefetch (int, optional): frames read ahead, 0 to read in caller thread. Defaults to 8.
+
+        Yields:
+            tuple: (idx, frame)
+
+        Note:
+            frames come from a recycled buffer pool, each frame is only valid until the next
+            iteration, copy it if it should be kept. mmap reader yields views directly.
+        """
+
+        stop = self.framenum if stop is None else min(stop, self.framenum)
+
+        if prefetch <= 0 or self.frames is not None:
+            for idx in range(start, stop):
+                yield idx, self.get_frame(idx)
+            return
+
+        frame_shape = self.pix_fmt.get_frame_shape(self.width, self.height)
+
+        # consumer holds one buffer, the rest are read ahead
+        free_buffers = queue.Queue()
+        for _ in range(prefetch + 1):
+            free_buffers.put(np.empty(frame_shape, dtype=self.pix_fmt.dtype))
+
+        ready_frames = queue.Queue()
+        stop_event = threading.Event()
+
+        def read_ahead():
+            try:
+                # own file handle, not to race with get_frame of caller thread
+                with open(self.filename, 'rb') as file:
+                    for idx in range(start, stop):
+                        buffer = free_buffers.get()
+                        if buffer is None or stop_event.is_set():
+                            break
+
+                        file.seek(self.get_frame_offset(idx))
+
+                        if file.readinto(buffer) != self.framesize:
+                            raise IOError(f"Error: incomplete frame {idx} of {self.filename}")
+
+                        ready_frames.put((idx, buffer))
+
+                ready_frames.put(None)
+
+            except Exception as e:
+                ready_frames.put(e)
+
+        thread = threading.Thread(target=read_ahead, daemon=True)
+        thread.start()
+
+        try:
+            while True:
+                item = ready_frames.get()
+
+                if item is None:
+                    break
+
+                if isinstance(item, Exception):
+                    raise item
+
+                idx, buffer = item
+
+                yield idx, buffer
+
+                free_buffers.put(buffer)
+        finally:
+            stop_event.set()
+            free_buffers.put(None)
+            thread.join()
+
+    def get_frame_planes(self, idx):
+        """get zero-copy plane views ("y", "u", "v") of frame, see PixelFormat.get_planes"""
+
+        return self.pix_fmt.get_planes(self.get_frame(idx), self.width, self.height)
+
     def get_frame_by_bgr(self, idx):
 
-        yuv = self.getFrame(idx)
+        if self.pix_fmt.cv2_to_bgr is None:
+            raise ValueError(f"Error: unsupported pixel format for bgr: {self.pix_fmt.name}")
+
+        def convert_to_bgr(yuv):
+            if self.pix_fmt.layout == "packed":
+                yuv = yuv.reshape(self.height, self.width, 2)
 
-        #NOTE(Chen Wei): BT601 limited range ?
-        bgr = cv2.cvtColor(yuv, cv2.COLOR_YUV2BGR_I420)
+            #NOTE(Chen Wei): BT601 limited range ?
+            return cv2.cvtColor(yuv, getattr(cv2, self.pix_fmt.cv2_to_bgr))
 
-        return bgr
\ No newline at end of file
+        return self.get_cached("bgr", idx, convert_to_bgr)
\ No newline at end of file
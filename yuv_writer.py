@@ -11,9 +11,14 @@
 
 import os
 import re
+import queue
+import threading
 import cv2
 import numpy as np
 
+from . import pixel_format
+from . import y4m
+
 #Note(Chen Wei): to improve futher
 
 class YuvWriter:
@@ -22,21 +27,231 @@ class YuvWriter:
         """init empty reader"""
         pass
 
-    def __init__(self, filename):
-        """init reader by filename """
-        self.open(filename)
+    # max frames coalesced into one writev
+    MAX_COALESCED_FRAMES = 64
+
+    def __init__(self, filename, pix_fmt="i420", width=None, height=None, fps="25:1", async_write=False, queue_size=8, frame_num=None):
+        """init writer by filename
+
+        Args:
+            filename (str): raw yuv file name, containing size as _WxH. if width/height not given, or y4m file name (*.y4m)
+            pix_fmt (str, optional): pixel format, see pixel_format.PIXEL_FORMATS. Defaults to "i420".
+            width (int, optional): image width. Defaults to None, i.e., parsed from filename.
+            height (int, optional): image height. Defaults to None, i.e., parsed from filename.
+            fps (str, optional): frame rate "num:den" written to y4m header. Defaults to "25:1".
+            async_write (bool, optional): write behind, frames are queued and written by background thread,
+                                          frames must not be modified after write_frame. Defaults to False.
+            queue_size (int, optional): max queued frames of async write. Defaults to 8.
+            frame_num (int, optional): preallocate file for frame_num frames and write frames by index,
+                                       see write_frame_at, frames of existing file are kept so that several
+                                       processes can open the same file, frames beyond frame_num are
+                                       truncated. Defaults to None.
+        """
+        self.open(filename, pix_fmt, width, height, fps, async_write, queue_size, frame_num)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
 
-    def open(self, filename):
+    def open(self, filename, pix_fmt="i420", width=None, height=None, fps="25:1", async_write=False, queue_size=8, frame_num=None):
         self.filename = filename
 
-        size = re.search(r'_(\d+)x(\d+)\.', filename)
-        self.width  = int(size.group(1))
-        self.height = int(size.group(2))
+        if width is None or height is None:
+            size = re.search(r'_(\d+)x(\d+)\.', filename)
+            width  = int(size.group(1))
+            height = int(size.group(2))
+
+        self.width  = width
+        self.height = height
+
+        self.pix_fmt = pixel_format.get_pixel_format(pix_fmt)
+
+        self.framesize = self.pix_fmt.get_frame_size(self.width, self.height)
+
+        self.is_y4m = y4m.is_y4m_file(filename)
 
-        self.framesize = int(self.width * self.height * 3 / 2)
+        self.thread = None
+        self.error = None
+
+        self.frame_num = frame_num
+
+        if frame_num is not None:
+            if async_write:
+                raise ValueError("Error: async write is not supported with frame_num")
+
+            self._open_preallocated(fps)
+            return
 
         self.file = open(filename, 'wb')
 
+        if self.is_y4m:
+            self.file.write(y4m.format_header(self.width, self.height, self.pix_fmt, fps))
+
+        if async_write:
+            # NOTE: background thread writes to fd directly, bypassing file buffer
+            self.file.flush()
+
+            self.frame_queue = queue.Queue(maxsize=queue_size)
+            self.thread = threading.Thread(target=self._write_behind, daemon=True)
+            self.thread.start()
+
+    def _open_preallocated(self, fps):
+        """open without truncation and preallocate file of frame_num frames"""
+
+        header = y4m.format_header(self.width, self.height, self.pix_fmt, fps) if self.is_y4m else b""
+
+        self.data_offset = len(header)
+        self.frame_stride = self.framesize + (len(y4m.FRAME_SIGNATURE) + 1 if self.is_y4m else 0)
+        self.frame_idx = 0
+
+        # NOTE: O_CREAT without O_TRUNC, frames written by other processes are kept
+        self.file = os.fdopen(os.open(self.filename, os.O_RDWR | os.O_CREAT, 0o644), 'r+b')
+
+        fd = self.file.fileno()
+        total_size = self.data_offset + self.frame_num * self.frame_stride
+
+        file_size = os.fstat(fd).st_size
+
+        if file_size < total_size:
+            if hasattr(os, "posix_fallocate"):
+                os.posix_fallocate(fd, 0, total_size)
+            else:
+                os.ftruncate(fd, total_size)
+        elif file_size > total_size:
+            # NOTE: drop stale frames of a longer file, every process truncates to the same size
+            os.ftruncate(fd, total_size)
+
+        if header:
+            self._pwrite([memoryview(header)], 0)
+
+    def _pwrite(self, buffers, offset):
+        """write byte buffers at offset, without moving file position"""
+
+        if not hasattr(os, "pwrite"):
+            # NOTE: not safe for concurrent writers
+            self.file.seek(offset)
+            for buffer in buffers:
+                self.file.write(buffer)
+            self.file.flush()
+            return
+
+        fd = self.file.fileno()
+
+        for buffer in buffers:
+            while buffer.nbytes:
+                written = os.pwrite(fd, buffer, offset)
+                buffer = buffer[written:]
+                offset += written
+
+    def write_frame_at(self, idx, yuv):
+        """write frame at index of preallocated file, frames can be written out of order and by several processes
+
+        Args:
+            idx (int): frame index
+            yuv (np.array): frame
+        """
+
+        if self.frame_num is None:
+            raise ValueError("Error: write_frame_at requires writer opened with frame_num")
+
+        if idx < 0 or idx >= self.frame_num:
+            raise IndexError("index out of range")
+
+        yuv = np.ascontiguousarray(yuv)
+
+        if yuv.nbytes != self.framesize:
+            raise ValueError(f"Error: frame of {yuv.nbytes} bytes, expect {self.framesize}")
+
+        buffers = [memoryview(yuv).cast('B')]
+        if self.is_y4m:
+            buffers.insert(0, memoryview(y4m.FRAME_SIGNATURE + b"\n"))
+
+        self._pwrite(buffers, self.data_offset + idx * self.frame_stride)
+
+    def _write_buffers(self, buffers):
+        """write byte buffers by writev, handling partial writes"""
+
+        if not hasattr(os, "writev"):
+            for buffer in buffers:
+                self.file.write(buffer)
+            return
+
+        fd = self.file.fileno()
+
+        while buffers:
+            written = os.writev(fd, buffers[:1024])
+
+            while buffers and written >= buffers[0].nbytes:
+                written -= buffers[0].nbytes
+                buffers.pop(0)
+
+            if written:
+                buffers[0] = buffers[0][written:]
+
+    def _write_behind(self):
+        """background thread, coalesces queued frames into one writev"""
+
+        stopped = False
+
+        while not stopped:
+            frames = [self.frame_queue.get()]
+
+            while len(frames) < self.MAX_COALESCED_FRAMES:
+                try:
+                    frames.append(self.frame_queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            buffers = []
+            for frame in frames:
+                if frame is None:
+                    stopped = True
+                    break
+
+                if self.is_y4m:
+                    buffers.append(memoryview(y4m.FRAME_SIGNATURE + b"\n"))
+                buffers.append(memoryview(frame).cast('B'))
+
+            try:
+                if self.error is None:
+                    self._write_buffers(buffers)
+            except Exception as e:
+                self.error = e
+
+            for _ in frames:
+                self.frame_queue.task_done()
+
+    def _raise_error(self):
+        if self.error is not None:
+            error, self.error = self.error, None
+            raise error
+
+    def flush(self):
+        """wait until queued frames are written, and flush file"""
+
+        if self.thread is not None:
+            self.frame_queue.join()
+            self._raise_error()
+
+        if self.file is not None:
+            self.file.flush()
+
+    def close(self):
+        if self.file is None:
+            return
+
+        try:
+            if self.thread is not None:
+                self.frame_queue.put(None)
+                self.thread.join()
+                self.thread = None
+                self._raise_error()
+        finally:
+            self.file.close()
+            self.file = None
+
     def get_width(self):
         return self.width
 
@@ -45,16 +260,56 @@ class YuvWriter:
     
     def get_frame_size(self):
         return self.framesize
+
+    def get_pixel_format(self):
+        return self.pix_fmt
+
+    def get_frame_planes(self, frame):
+        """get zero-copy plane views ("y", "u", "v") of frame to fill before write_frame"""
+
+        return self.pix_fmt.get_planes(frame, self.width, self.height)
+
+    def create_frame(self):
+        """create empty frame of the pixel format"""
+
+        return np.empty(self.pix_fmt.get_frame_shape(self.width, self.height), dtype=self.pix_fmt.dtype)
     
     def write_frame(self, yuv):
 
-        buffer = yuv.tobytes()
+        if self.frame_num is not None:
+            self.write_frame_at(self.frame_idx, yuv)
+            self.frame_idx += 1
+            return
+
+        # NOTE: write by buffer protocol, no tobytes copy for contiguous frame
+        yuv = np.ascontiguousarray(yuv)
+
+        if self.thread is not None:
+            self._raise_error()
+            self.frame_queue.put(yuv)
+            return
 
-        self.file.write(buffer)
+        if self.is_y4m:
+            self.file.write(y4m.FRAME_SIGNATURE + b"\n")
+
+        self.file.write(memoryview(yuv).cast('B'))
 
     def write_frame_by_bgr(self, bgr):
 
         #NOTE(Chen Wei): BT601 limited range ?
-        yuv = cv2.cvtColor(bgr, cv2.COLOR_BGR2YUV_I420)
+        if self.pix_fmt.cv2_from_bgr is not None:
+            yuv = cv2.cvtColor(bgr, getattr(cv2, self.pix_fmt.cv2_from_bgr))
+
+        elif self.pix_fmt.subsampling == (2, 2):
+            # repack from i420
+            i420_fmt = pixel_format.get_pixel_format("i420")
+            i420 = cv2.cvtColor(bgr, getattr(cv2, i420_fmt.cv2_from_bgr))
+
+            yuv = self.create_frame()
+            pixel_format.convert_planes(i420_fmt.get_planes(i420, self.width, self.height),
+                                        self.get_frame_planes(yuv), i420_fmt, self.pix_fmt)
+
+        else:
+            raise ValueError(f"Error: unsupported pixel format for bgr: {self.pix_fmt.name}")
 
         self.write_frame(yuv)
\ No newline at end of file